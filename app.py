@@ -7,20 +7,24 @@ KOL 评价报告生成器 - Web 服务
 
 import os
 import json
+import hashlib
+import mimetypes
 import sqlite3
 import asyncio
 import threading
+import uuid
 from dataclasses import asdict
 from pathlib import Path
 from flask import Flask, render_template, request, jsonify, send_from_directory
 from flask_cors import CORS
+from werkzeug.exceptions import NotFound
 
 from twitter_crawler import TwitterCrawler
 from models.data_model import Account, Tweet
 from scoring.engine import calculate, save_tree_structure
 from scoring.schema import score_tree
 from scoring.normalization_manager import NormalizationManager
-from generate_static_html import generate_main_page, generate_user_page, read_json_file
+from generate_static_html import generate_main_page_parts, generate_user_page_parts, read_json_file, write_html_file, write_static_assets
 
 app = Flask(__name__)
 CORS(app)
@@ -39,6 +43,9 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(STATIC_HTML_DIR, exist_ok=True)
 os.makedirs('templates', exist_ok=True)
 
+# 页面共享的样式表和脚本在启动时写入一次（所有生成的页面都引用这些文件，请求处理中不再重写）
+write_static_assets(STATIC_HTML_DIR)
+
 # 任务状态存储（简单实现，生产环境应使用Redis等）
 tasks = {}
 
@@ -86,8 +93,8 @@ def convert_twitter_db_to_scoring_format(twitter_db_path: str, username: str):
             retweets_count=int(row[5]) if row[5] is not None else 0,
             replies_count=int(row[6]) if row[6] is not None else 0,
             views_count=int(row[7]) if row[7] is not None else 0,
-            in_reply_to_status_id_str=str(row[8]) if len(row) > 8 and row[8] is not None else None,
-            is_quote_status=int(row[9]) if len(row) > 9 and row[9] is not None else 0
+            in_reply_to_status_id_str=str(row[8]) if row[8] is not None else None,
+            is_quote_status=int(row[9]) if row[9] is not None else 0
         )
         all_tweets.append(tweet)
     
@@ -110,27 +117,27 @@ def convert_twitter_db_to_scoring_format(twitter_db_path: str, username: str):
 
 def process_user(username: str, task_id: str):
     """处理用户分析任务（在后台线程中运行）"""
+    # 绑定任务状态字典，后续各步骤直接更新，无需每次按 task_id 查找
+    task = tasks[task_id] = {
+        'status': 'running',
+        'progress': 0,
+        'message': '开始处理...',
+        'error': None,
+        'result': None
+    }
     try:
-        tasks[task_id] = {
-            'status': 'running',
-            'progress': 0,
-            'message': '开始处理...',
-            'error': None,
-            'result': None
-        }
-        
         # 检查 API 密钥
         TWEETSCOUT_API_KEY = os.getenv("TWEETSCOUT_API_KEY")
         OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
         
         if not TWEETSCOUT_API_KEY:
-            tasks[task_id]['status'] = 'error'
-            tasks[task_id]['error'] = '未设置 TWEETSCOUT_API_KEY 环境变量'
+            task['status'] = 'error'
+            task['error'] = '未设置 TWEETSCOUT_API_KEY 环境变量'
             return
         
         if not OPENAI_API_KEY:
-            tasks[task_id]['status'] = 'error'
-            tasks[task_id]['error'] = '未设置 OPENAI_API_KEY 环境变量'
+            task['status'] = 'error'
+            task['error'] = '未设置 OPENAI_API_KEY 环境变量'
             return
         
         # 确保目录存在
@@ -141,8 +148,8 @@ def process_user(username: str, task_id: str):
         twitter_db_path = os.path.join(DATA_DIR, f"twitter_data_{username}.db")
         
         # 步骤 1: 爬取数据
-        tasks[task_id]['progress'] = 10
-        tasks[task_id]['message'] = 'Crawling data...'
+        task['progress'] = 10
+        task['message'] = 'Crawling data...'
         
         crawler = TwitterCrawler(
             api_key=TWEETSCOUT_API_KEY,
@@ -158,44 +165,44 @@ def process_user(username: str, task_id: str):
             )
             
             if not result or result.get('tweets_crawled', 0) == 0:
-                tasks[task_id]['status'] = 'error'
-                tasks[task_id]['error'] = f'未能爬取到 {username} 的推文数据'
+                task['status'] = 'error'
+                task['error'] = f'未能爬取到 {username} 的推文数据'
                 return
             
         except Exception as e:
-            tasks[task_id]['status'] = 'error'
-            tasks[task_id]['error'] = f'爬取失败: {str(e)}'
+            task['status'] = 'error'
+            task['error'] = f'爬取失败: {str(e)}'
             return
         finally:
             crawler.close()
         
         # 步骤 2: 转换数据格式
-        tasks[task_id]['progress'] = 30
-        tasks[task_id]['message'] = 'Converting data format...'
+        task['progress'] = 30
+        task['message'] = 'Converting data format...'
         
         try:
             accounts, all_tweets = convert_twitter_db_to_scoring_format(twitter_db_path, username)
             
             if not accounts or len(accounts) == 0:
-                tasks[task_id]['status'] = 'error'
-                tasks[task_id]['error'] = f'No user data found: {username}'
+                task['status'] = 'error'
+                task['error'] = f'No user data found: {username}'
                 return
             
             account = accounts[0]
             
             if len(account.tweets) == 0:
-                tasks[task_id]['status'] = 'error'
-                tasks[task_id]['error'] = 'This user has no tweet data, cannot calculate score'
+                task['status'] = 'error'
+                task['error'] = 'This user has no tweet data, cannot calculate score'
                 return
             
         except Exception as e:
-            tasks[task_id]['status'] = 'error'
-            tasks[task_id]['error'] = f'Data conversion failed: {str(e)}'
+            task['status'] = 'error'
+            task['error'] = f'Data conversion failed: {str(e)}'
             return
         
         # 步骤 3: 计算评分
-        tasks[task_id]['progress'] = 50
-        tasks[task_id]['message'] = 'Calculating score (this may take some time)...'
+        task['progress'] = 50
+        task['message'] = 'Calculating score (this may take some time)...'
         
         norm_manager = NormalizationManager()
         norm_manager.load_normalization_params()
@@ -218,13 +225,13 @@ def process_user(username: str, task_id: str):
             save_tree_structure(score_tree, os.path.join(OUTPUT_DIR, f"tree_structure_{username}.json"))
             
         except Exception as e:
-            tasks[task_id]['status'] = 'error'
-            tasks[task_id]['error'] = f'Score calculation failed: {str(e)}'
+            task['status'] = 'error'
+            task['error'] = f'Score calculation failed: {str(e)}'
             return
         
         # 步骤 4: 生成 HTML 网页
-        tasks[task_id]['progress'] = 80
-        tasks[task_id]['message'] = 'Generating evaluation page...'
+        task['progress'] = 80
+        task['message'] = 'Generating evaluation page...'
         
         try:
             # 读取数据
@@ -236,22 +243,20 @@ def process_user(username: str, task_id: str):
             comments = scores_data.get('comments', {})
             
             # 生成主页面
-            main_html = generate_main_page(accounts_data, scores, tree_structure)
+            main_html = generate_main_page_parts(accounts_data, scores, tree_structure)
             main_file = os.path.join(STATIC_HTML_DIR, f'index_{username}.html')
-            with open(main_file, 'w', encoding='utf-8') as f:
-                f.write(main_html)
+            write_html_file(main_file, main_html)
             
             # 生成用户详细页面
-            user_html = generate_user_page(accounts_data[0], scores, comments, tree_structure, 0)
+            user_html = generate_user_page_parts(accounts_data[0], scores, comments, tree_structure, 0)
             user_file = os.path.join(STATIC_HTML_DIR, f'user_{username}.html')
-            with open(user_file, 'w', encoding='utf-8') as f:
-                f.write(user_html)
+            write_html_file(user_file, user_html)
             
             # 完成
-            tasks[task_id]['progress'] = 100
-            tasks[task_id]['status'] = 'completed'
-            tasks[task_id]['message'] = 'Completed!'
-            tasks[task_id]['result'] = {
+            task['progress'] = 100
+            task['status'] = 'completed'
+            task['message'] = 'Completed!'
+            task['result'] = {
                 'username': username,
                 'main_page': f'/static_html/index_{username}.html',
                 'user_page': f'/static_html/user_{username}.html',
@@ -259,13 +264,13 @@ def process_user(username: str, task_id: str):
             }
             
         except Exception as e:
-            tasks[task_id]['status'] = 'error'
-            tasks[task_id]['error'] = f'Failed to generate page: {str(e)}'
+            task['status'] = 'error'
+            task['error'] = f'Failed to generate page: {str(e)}'
             return
             
     except Exception as e:
-        tasks[task_id]['status'] = 'error'
-        tasks[task_id]['error'] = f'Processing failed: {str(e)}'
+        task['status'] = 'error'
+        task['error'] = f'Processing failed: {str(e)}'
 
 
 @app.route('/')
@@ -284,7 +289,6 @@ def analyze():
         return jsonify({'error': 'Please enter a username'}), 400
     
     # 生成任务ID
-    import uuid
     task_id = str(uuid.uuid4())
     
     # 启动后台任务
@@ -309,8 +313,20 @@ def get_task_status(task_id):
 
 @app.route('/static_html/<path:filename>')
 def serve_static_html(filename):
-    """提供静态HTML文件"""
-    return send_from_directory(STATIC_HTML_DIR, filename)
+    """提供静态HTML文件（存在预压缩的 .gz 版本且客户端支持 gzip 时直接返回压缩文件）"""
+    if 'gzip' in request.accept_encodings:
+        try:
+            resp = send_from_directory(STATIC_HTML_DIR, f'{filename}.gz',
+                                       mimetype=mimetypes.guess_type(filename)[0])
+        except NotFound:
+            pass
+        else:
+            resp.headers['Content-Encoding'] = 'gzip'
+            resp.vary.add('Accept-Encoding')
+            return resp
+    resp = send_from_directory(STATIC_HTML_DIR, filename)
+    resp.vary.add('Accept-Encoding')
+    return resp
 
 
 @app.route('/api/history', methods=['GET'])
@@ -344,10 +360,13 @@ def get_history():
             # 按用户名排序
             history_list.sort(key=lambda x: x['username'].lower())
             
-            return jsonify({
+            # 历史列表只在生成新报告后变化，前端轮询/刷新时带 If-None-Match 可直接返回 304
+            resp = jsonify({
                 'success': True,
                 'history': history_list
             })
+            resp.set_etag(hashlib.blake2b(resp.get_data(), digest_size=8).hexdigest())
+            return resp.make_conditional(request)
         else:
             return jsonify({
                 'success': True,
@@ -12,6 +12,7 @@ import os
 import json
 import sqlite3
 import asyncio
+import traceback
 from dataclasses import asdict
 from pathlib import Path
 
@@ -20,7 +21,7 @@ from models.data_model import Account, Tweet
 from scoring.engine import calculate, save_tree_structure
 from scoring.schema import score_tree
 from scoring.normalization_manager import NormalizationManager
-from generate_static_html import generate_main_page, generate_user_page, read_json_file
+from generate_static_html import generate_main_page_parts, read_json_file, write_static_assets, write_user_pages
 
 # ==================== 配置 ====================
 # 要分析的 Twitter 用户名（不含 @）
@@ -88,18 +89,18 @@ def convert_twitter_db_to_scoring_format(twitter_db_path: str, username: str):
     all_tweets = []
     for row in tweet_rows:
         # 确保 full_text 是字符串类型
-        full_text = str(row[4]) if len(row) > 4 and row[4] is not None else ""
+        full_text = str(row[4]) if row[4] is not None else ""
         
         tweet = Tweet(
             tweet_id=str(row[0]) if row[0] is not None else "",
-            author_id=str(row[2]) if len(row) > 2 and row[2] is not None else "",
+            author_id=str(row[2]) if row[2] is not None else "",
             full_text=full_text,
-            likes_count=int(row[6]) if len(row) > 6 and row[6] is not None else 0,
-            retweets_count=int(row[7]) if len(row) > 7 and row[7] is not None else 0,
-            replies_count=int(row[8]) if len(row) > 8 and row[8] is not None else 0,
-            views_count=int(row[9]) if len(row) > 9 and row[9] is not None else 0,
-            in_reply_to_status_id_str=str(row[10]) if len(row) > 10 and row[10] is not None else None,
-            is_quote_status=int(row[11]) if len(row) > 11 and row[11] is not None else 0
+            likes_count=int(row[6]) if row[6] is not None else 0,
+            retweets_count=int(row[7]) if row[7] is not None else 0,
+            replies_count=int(row[8]) if row[8] is not None else 0,
+            views_count=int(row[9]) if row[9] is not None else 0,
+            in_reply_to_status_id_str=str(row[10]) if row[10] is not None else None,
+            is_quote_status=int(row[11]) if row[11] is not None else 0
         )
         all_tweets.append(tweet)
     
@@ -174,7 +175,6 @@ def main():
         
     except Exception as e:
         print(f"❌ 爬取失败: {e}")
-        import traceback
         traceback.print_exc()
         return 1
     finally:
@@ -203,7 +203,6 @@ def main():
         
     except Exception as e:
         print(f"❌ 数据转换失败: {e}")
-        import traceback
         traceback.print_exc()
         return 1
     
@@ -246,7 +245,6 @@ def main():
         
     except Exception as e:
         print(f"❌ 评分计算失败: {e}")
-        import traceback
         traceback.print_exc()
         return 1
     
@@ -263,20 +261,20 @@ def main():
         scores = scores_data.get('scores', scores_data)
         comments = scores_data.get('comments', {})
         
+        # 写入页面共享的样式表和脚本
+        write_static_assets(STATIC_HTML_DIR)
+        
         # 生成主页面
-        main_html = generate_main_page(accounts_data, scores, tree_structure)
-        with open(os.path.join(STATIC_HTML_DIR, 'index.html'), 'w', encoding='utf-8') as f:
-            f.write(main_html)
-        print(f"✅ 已生成主页面: {STATIC_HTML_DIR}/index.html")
+        main_html = generate_main_page_parts(accounts_data, scores, tree_structure)
+        main_page = (os.path.join(STATIC_HTML_DIR, 'index.html'), main_html)
         
-        # 生成用户详细页面
+        # 生成用户详细页面（用户较多时多进程生成），与主页面一起写入
+        write_user_pages(accounts_data, scores, comments, tree_structure, STATIC_HTML_DIR,
+                         other_pages=[main_page])
+        print(f"✅ 已生成主页面: {STATIC_HTML_DIR}/index.html")
         for i, account in enumerate(accounts_data):
-            user_html = generate_user_page(account, scores, comments, tree_structure, i)
-            filename = f'user_{i}.html'
-            with open(os.path.join(STATIC_HTML_DIR, filename), 'w', encoding='utf-8') as f:
-                f.write(user_html)
             username = account.get('username', '未知')
-            print(f"✅ 已生成用户页面: {STATIC_HTML_DIR}/{filename} (用户: {username})")
+            print(f"✅ 已生成用户页面: {STATIC_HTML_DIR}/user_{i}.html (用户: {username})")
         
         print()
         print("=" * 60)
@@ -290,7 +288,6 @@ def main():
         
     except Exception as e:
         print(f"❌ 生成网页失败: {e}")
-        import traceback
         traceback.print_exc()
         return 1
     
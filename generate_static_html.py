@@ -5,10 +5,35 @@
 生成的文件保存在 static_html/ 目录
 """
 
+import io
 import os
+import math
+import posixpath
+import re
+import sys
 import json
+import gzip
+import asyncio
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
 
 def read_json_file(filepath):
     """读取JSON文件"""
@@ -23,6 +48,98 @@ def escape_js_string(s):
     return json.dumps(str(s), ensure_ascii=False)
 
 
+def _has_non_finite(data):
+    """递归检查数据中是否含有 NaN / Infinity（按类型查表分派，JSON 数据只包含 dict / list / str / 数值）"""
+    checker = _NON_FINITE_CHECKERS.get(type(data))
+    return checker(data) if checker is not None else False
+
+
+_NON_FINITE_CHECKERS = {
+    dict: lambda data: any(map(_has_non_finite, data.values())),
+    list: lambda data: any(map(_has_non_finite, data)),
+    float: lambda data: not math.isfinite(data),
+}
+
+
+def _dumps_finite_json(obj):
+    """
+    序列化不含 NaN / Infinity 的数据为 JSON 文本
+
+    安装了 orjson 时使用 orjson（C 实现，大数据量时明显更快），否则使用标准库 json。
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _dumps_json(obj):
+    """
+    序列化为 JSON 文本
+
+    orjson 会把 NaN / Infinity 输出为 null，而标准库 json 输出 NaN / Infinity 字面量；
+    含有这类数值的数据始终使用标准库 json，是否安装 orjson 输出都相同。
+    """
+    if _has_non_finite(obj):
+        return json.dumps(obj, ensure_ascii=False)
+    return _dumps_finite_json(obj)
+
+
+def to_js(obj):
+    """
+    将数据序列化为可内嵌到 <script> 中的 JSON 字符串
+
+    输出中的 "</" 转义为 "<\\/"，避免数据中的 </script> 提前结束脚本标签。
+    """
+    return _dumps_json(obj).replace('</', '<\\/')
+
+
+def to_js_parse(obj):
+    """
+    将数据序列化为 JSON.parse('...') 表达式，用于内嵌较大的数据（scores / comments 等）
+
+    浏览器解析 JSON 字符串比解析同样内容的对象字面量快得多。
+    数据中含有标准 JSON 不支持的 NaN / Infinity 时（先行检查，与是否安装 orjson 无关），
+    退回 to_js 的对象字面量形式。
+    """
+    if _has_non_finite(obj):
+        return to_js(obj)
+    js = _dumps_finite_json(obj)
+    # 转义为单引号字符串字面量（JSON 中单引号很少，比双引号字符串短）
+    js = js.replace('\\', '\\\\').replace("'", "\\'").replace('</', '<\\/')
+    return f"JSON.parse('{js}')"
+
+
+# 需要替换为单个空格的空白：两个及以上连续的空格/换行/回车/制表符，或单个换行/回车/制表符
+_WHITESPACE_RUN_RE = re.compile(r'[ \n\r\t]{2,}|[\n\r\t]')
+
+
+@lru_cache(maxsize=4096)
+def _clean_text(text):
+    """
+    将换行符、回车符、制表符替换为空格，合并连续空格并去除首尾空白，避免破坏 JavaScript 语法
+
+    评语和简介中大量重复的字符串（如默认评语）只需清理一次
+    """
+    # 单次扫描：换行/回车/制表符及连续空白都替换为单个空格；无需替换时不产生新字符串
+    return _WHITESPACE_RUN_RE.sub(' ', text).strip()
+
+
+def clean_comments(comments_data):
+    """递归清理 comments 中的换行符（按类型查表分派，JSON 数据只包含 dict / list / str / 数值）"""
+    cleaner = _COMMENT_CLEANERS.get(type(comments_data))
+    return cleaner(comments_data) if cleaner is not None else comments_data
+
+
+_COMMENT_CLEANERS = {
+    dict: lambda data: {k: clean_comments(v) for k, v in data.items()},
+    list: lambda data: [clean_comments(item) for item in data],
+    str: _clean_text,
+}
+
+
 def extract_leaf_nodes(node):
     """从树结构中提取所有叶节点"""
     leaves = []
@@ -36,303 +153,19 @@ def extract_leaf_nodes(node):
     return leaves
 
 
-def generate_main_page(accounts, scores, tree_structure):
-    """生成主页面HTML"""
-    # 读取模板
-    template_path = Path('views/view_scores.html')
-    with open(template_path, 'r', encoding='utf-8') as f:
-        html = f.read()
-    
-    # 过滤掉tweets数据，只保留基本字段，并移除description中的换行符
-    accounts_simple = []
-    for account in accounts:
-        description = account.get('description', '')
-        # 移除换行符，替换为空格
-        if description is None:
-            description = ''
-        else:
-            # 将换行符、回车符替换为空格，并清理多余空格
-            description = description.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-            # 将多个连续空格替换为单个空格
-            while '  ' in description:
-                description = description.replace('  ', ' ')
-            description = description.strip()
-        accounts_simple.append({
-            'user_id': account.get('user_id'),
-            'username': account.get('username'),
-            'description': description,
-            'followers_count': account.get('followers_count'),
-            'friends_count': account.get('friends_count'),
-            'tweets_count': account.get('tweets_count'),
-        })
-    
-    # 将数据内嵌到JavaScript中
-    accounts_js = json.dumps(accounts_simple, ensure_ascii=False)
-    scores_js = json.dumps(scores, ensure_ascii=False)
-    tree_structure_js = json.dumps(tree_structure, ensure_ascii=False)
-    
-    # 替换fetch调用为内嵌数据
-    new_script = """
-        let accounts = """ + accounts_js + """;
-        let scores = """ + scores_js + """;
-        let treeStructure = """ + tree_structure_js + """;
-        let filteredData = [];
-        let sortColumn = 'root';
-        let sortDirection = 'desc';
-        let leafNodes = []; // 所有叶节点
-
-        // 从树结构中提取所有叶节点
-        function extractLeafNodes(node) {
-            const leaves = [];
-            function traverse(n) {
-                if (n.is_leaf) {
-                    leaves.push(n);
-                } else if (n.children) {
-                    n.children.forEach(child => traverse(child));
-                }
-            }
-            traverse(node);
-            return leaves;
-        }
-
-        // Dynamically generate table header
-        function generateTableHeader() {
-            const thead = document.getElementById('tableHead');
-            const tr = thead.querySelector('tr');
-            
-            // Keep the first columns, remove the rest
-            while (tr.children.length > 3) {
-                tr.removeChild(tr.lastChild);
-            }
-            
-            // Add leaf node columns
-            leafNodes.forEach(leaf => {
-                const th = document.createElement('th');
-                th.className = 'sortable';
-                th.setAttribute('data-sort', leaf.key);
-                th.textContent = leaf.name;
-                tr.appendChild(th);
-            });
-            
-            // Add description column
-            const descTh = document.createElement('th');
-            descTh.textContent = 'Description';
-            tr.appendChild(descTh);
-        }
-
-        // Dynamically generate sort options
-        function generateSortOptions() {
-            const sortSelect = document.getElementById('sortSelect');
-            
-            // Keep the first options, remove the rest
-            while (sortSelect.children.length > 2) {
-                sortSelect.removeChild(sortSelect.lastChild);
-            }
-            
-            // Add leaf node options
-            leafNodes.forEach(leaf => {
-                const option = document.createElement('option');
-                option.value = leaf.key;
-                option.textContent = `Sort by ${leaf.name}`;
-                sortSelect.appendChild(option);
-            });
-        }
-
-        // Load data (embedded, no fetch needed)
-        function loadData() {
-            try {
-                // Extract all leaf nodes
-                leafNodes = extractLeafNodes(treeStructure);
-
-                // Dynamically generate table header and sort options
-                generateTableHeader();
-                generateSortOptions();
-
-                // Merge data (dynamically add leaf node scores)
-                filteredData = accounts.map((account, index) => {
-                    const item = {
-                        ...account,
-                        index: index,
-                        root: scores.root?.[index] ?? 0
-                    };
-                    
-                    // Dynamically add leaf node scores
-                    leafNodes.forEach(leaf => {
-                        item[leaf.key] = scores[leaf.key]?.[index] ?? 0;
-                    });
-                    
-                    return item;
-                });
-
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('scoreTable').style.display = 'table';
-                renderTable();
-            } catch (error) {
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('error').style.display = 'block';
-                document.getElementById('error').textContent = `Error: ${error.message}`;
-            }
-        }
-
-        // Render table
-        function renderTable() {
-            const tbody = document.getElementById('tableBody');
-            tbody.innerHTML = '';
-
-            // Sort
-            filteredData.sort((a, b) => {
-                const aVal = a[sortColumn] ?? 0;
-                const bVal = b[sortColumn] ?? 0;
-                const comparison = aVal > bVal ? 1 : aVal < bVal ? -1 : 0;
-                return sortDirection === 'asc' ? comparison : -comparison;
-            });
-
-            // Search filter
-            const searchTerm = document.getElementById('searchInput').value.toLowerCase();
-            const displayData = filteredData.filter(item => {
-                if (!searchTerm) return true;
-                return (
-                    item.username?.toLowerCase().includes(searchTerm) ||
-                    item.user_id?.toString().includes(searchTerm) ||
-                    item.description?.toLowerCase().includes(searchTerm)
-                );
-            });
-
-            // Update statistics
-            document.getElementById('totalUsers').textContent = filteredData.length;
-            document.getElementById('displayedUsers').textContent = displayData.length;
-
-            // Render rows
-            displayData.forEach(item => {
-                const row = document.createElement('tr');
-                let rowHTML = `
-                    <td>
-                        <div class="username" onclick="window.location.href='user_${item.index}.html'">${escapeHtml(item.username || 'Unknown')}</div>
-                    </td>
-                    <td>
-                        <div class="user-id">${escapeHtml(item.user_id || '')}</div>
-                    </td>
-                    <td class="score-cell">
-                        <div class="score-bar">
-                            <div class="score-bar-fill" style="width: ${item.root * 100}%"></div>
-                        </div>
-                        ${formatScore(item.root)}
-                    </td>
-                `;
-                
-                // Dynamically generate leaf node columns
-                leafNodes.forEach(leaf => {
-                    const score = item[leaf.key] ?? 0;
-                    rowHTML += `
-                        <td class="score-cell">
-                            <div class="score-bar">
-                                <div class="score-bar-fill" style="width: ${score * 100}%"></div>
-                            </div>
-                            ${formatScore(score)}
-                        </td>
-                    `;
-                });
-                
-                // Description column
-                rowHTML += `
-                    <td style="max-width: 300px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap;">
-                        ${escapeHtml(item.description || '')}
-                    </td>
-                `;
-                
-                row.innerHTML = rowHTML;
-                tbody.appendChild(row);
-            });
-
-            // Update table header sort indicator
-            document.querySelectorAll('th.sortable').forEach(th => {
-                th.classList.remove('sort-asc', 'sort-desc');
-                if (th.getAttribute('data-sort') === sortColumn) {
-                    th.classList.add(sortDirection === 'asc' ? 'sort-asc' : 'sort-desc');
-                }
-            });
-        }
-
-        // Format score
-        function formatScore(score) {
-            if (score === null || score === undefined) return '0.00%';
-            return (score * 100).toFixed(2) + '%';
-        }
-
-        // Escape HTML
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-
-        // Event listeners
-        document.getElementById('searchInput').addEventListener('input', renderTable);
-        
-        document.getElementById('sortSelect').addEventListener('change', (e) => {
-            sortColumn = e.target.value;
-            renderTable();
-        });
-
-        // Table header sorting
-        document.addEventListener('DOMContentLoaded', () => {
-            // Use event delegation to handle dynamically generated table headers
-            document.getElementById('tableHead').addEventListener('click', (e) => {
-                const th = e.target.closest('th.sortable');
-                if (!th) return;
-                
-                const column = th.getAttribute('data-sort');
-                if (sortColumn === column) {
-                    sortDirection = sortDirection === 'asc' ? 'desc' : 'asc';
-                } else {
-                    sortColumn = column;
-                    sortDirection = 'desc';
-                }
-                
-                // Update sort select box
-                document.getElementById('sortSelect').value = sortColumn;
-                
-                renderTable();
-            });
-        });
-
-        // Initialize - wait for DOM to load
-        if (document.readyState === "loading") {
-            document.addEventListener("DOMContentLoaded", loadData);
-        } else {
-            loadData();
-        }
+def simplify_account(account):
     """
-    
-    # 找到并替换script标签中的内容
-    import re
-    pattern = r'(<script>)(.*?)(</script>)'
-    replacement = f'\\1{new_script}\\3'
-    html = re.sub(pattern, replacement, html, flags=re.DOTALL)
-    
-    return html
-
+    过滤掉tweets数据，只保留页面需要的基本字段，并移除description中的换行符
 
-def generate_user_page(account, scores, comments, tree_structure, user_index):
-    """生成单个用户页面HTML"""
-    # 读取模板
-    template_path = Path('views/user_report.html')
-    with open(template_path, 'r', encoding='utf-8') as f:
-        html = f.read()
-    
-    # 过滤掉tweets数据，只保留基本字段，并移除description中的换行符
+    不修改传入的账户字典；批次调用方对每个账户只调用一次，再把结果传给各页面。
+    """
     description = account.get('description', '')
     # 移除换行符，替换为空格
     if description is None:
         description = ''
     else:
-        # 将换行符、回车符替换为空格，并清理多余空格
-        description = description.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-        # 将多个连续空格替换为单个空格
-        while '  ' in description:
-            description = description.replace('  ', ' ')
-        description = description.strip()
-    account_simple = {
+        description = _clean_text(description)
+    return {
         'user_id': account.get('user_id'),
         'username': account.get('username'),
         'description': description,
@@ -340,309 +173,375 @@ def generate_user_page(account, scores, comments, tree_structure, user_index):
         'friends_count': account.get('friends_count'),
         'tweets_count': account.get('tweets_count'),
     }
+
+
+# 写入页面时的缓冲区大小：页面由多个片段组成，较大的缓冲区可以把小片段合并成较少的系统调用
+WRITE_BUFFER_SIZE = 1 << 16
+
+# 页面预压缩 .gz 的压缩级别（页面数量多，取压缩率与生成耗时的折中）
+HTML_GZIP_LEVEL = 6
+# 共享样式表 / 脚本的压缩级别（每批次只写一次，使用最高压缩率）
+ASSET_GZIP_LEVEL = 9
+
+
+def _write_with_gzip(path, chunks, compresslevel):
+    """写入文件，并在同一目录写入预压缩的 .gz 版本（mtime=0 使相同内容的压缩结果保持一致）"""
+    path = str(path)
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.writelines(chunks)
+    with gzip.GzipFile(f'{path}.gz', 'wb', compresslevel=compresslevel, mtime=0) as f:
+        f.writelines(chunks)
+
+
+def _replace_file(path, data):
+    """先写入同目录的临时文件，再用 os.replace 原子替换（读取方不会看到写了一半的文件）"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_asset(path, data):
+    """
+    写入共享样式表 / 脚本及其 .gz 版本；内容与已有文件相同时跳过
+
+    两个文件都经临时文件原子替换，先写 .gz：中途失败时原文件仍是旧内容，下次调用会重新写入。
+    """
+    path = str(path)
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data and os.path.exists(f'{path}.gz'):
+                return
+    except FileNotFoundError:
+        pass
+    _replace_file(f'{path}.gz', gzip.compress(data, compresslevel=ASSET_GZIP_LEVEL, mtime=0))
+    _replace_file(path, data)
+
+
+def write_html_file(path, content):
+    """
+    写入单个 HTML 文件及其预压缩的 .gz 版本（静态服务器可直接返回压缩内容）
+
+    content 可以是字符串或片段列表（逐段编码写入，不先拼接成完整字符串）
+    """
+    if isinstance(content, str):
+        content = (content,)
+    _write_with_gzip(path, [part.encode('utf-8') for part in content], HTML_GZIP_LEVEL)
+
+
+async def write_html_files(pages, max_concurrency=32):
+    """
+    在批次末尾并发写入所有 HTML 文件
+
+    Args:
+        pages: [(文件路径, HTML内容), ...]，HTML内容可以是字符串或片段列表（逐段写入）
+        max_concurrency: 同时写入的文件数上限（限制打开的文件描述符数量）
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def write_one(path, content):
+        async with semaphore:
+            await asyncio.to_thread(write_html_file, path, content)
+
+    await asyncio.gather(*(write_one(path, content) for path, content in pages))
+
+
+# 模板中需要替换为新脚本的内联 <script> 标签
+_SCRIPT_RE = re.compile(r'(<script>)(.*?)(</script>)', re.DOTALL)
+
+# 模板中的内联 <style> 块（生成静态页面时外置为共享样式表）
+_STYLE_RE = re.compile(r'<style>(.*?)</style>', re.DOTALL)
+
+# 页面模板 -> 外置样式表文件名（与页面写入同一目录，所有页面共享同一份，浏览器只需下载一次）
+_PAGE_STYLESHEETS = {
+    'views/view_scores.html': 'view_scores.css',
+    'views/user_report.html': 'user_report.css',
+}
+
+# 页面模板 -> (共享脚本文件名, 脚本源文件)（页面中数据之外的全部逻辑，由 write_static_assets 写入输出目录，各页面只内嵌数据）。
+# 模板按相对于模板目录的 URL 路径引用脚本源文件，生成页面时改为引用输出目录中的共享脚本
+_PAGE_SCRIPTS = {
+    'views/view_scores.html': ('view_scores.js', 'views/static/view_scores.js'),
+    'views/user_report.html': ('user_report.js', 'views/static/user_report.js'),
+}
+
+
+@lru_cache(maxsize=None)
+def _read_template(template_path):
+    """读取模板 / 脚本文件原文（每个文件在进程内只读取一次）"""
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# CSS 注释
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# CSS 压缩：引号字符串原样保留；标点 { } ; : , > 两侧的空白去掉；其余连续空白合并为一个空格
+_CSS_TOKEN_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|\s*([{};:,>])\s*|\s+""")
+
+
+def _css_token(match):
+    string, punct = match.group(1, 2)
+    if string is not None:
+        return string
+    if punct is not None:
+        return punct
+    return ' '
+
+
+def minify_css(css):
+    """压缩 CSS（去除注释和多余空白）；安装了 rcssmin 时使用 rcssmin"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(css)
+    css = _CSS_COMMENT_RE.sub('', css)
+    return _CSS_TOKEN_RE.sub(_css_token, css).strip()
+
+
+@lru_cache(maxsize=None)
+def template_stylesheet(template_path):
+    """返回模板内联 <style> 块中的 CSS（已压缩），模板没有内联样式时返回 None"""
+    match = _STYLE_RE.search(_read_template(template_path))
+    return minify_css(match.group(1)) if match is not None else None
+
+
+# JS 压缩（未安装 rjsmin 时）：去掉行首缩进、行尾空白和空行。页面脚本中没有续行的字符串，
+# 跨行的只有模板字符串里的 HTML 标记，其中的缩进不影响渲染
+_JS_LINE_WHITESPACE_RE = re.compile(r'[ \t]*\n\s*')
+
+
+@lru_cache(maxsize=None)
+def minify_js(js):
+    """压缩共享脚本；安装了 rjsmin 时使用 rjsmin，否则只去掉缩进和空行"""
+    if rjsmin is not None:
+        return rjsmin.jsmin(js)
+    return _JS_LINE_WHITESPACE_RE.sub('\n', js).strip()
+
+
+def write_static_assets(output_dir):
+    """
+    将各页面模板的样式和页面脚本写入输出目录的共享样式表 / 脚本文件（附带预压缩的 .gz 版本）
+
+    在生成页面之前调用一次（批量生成时每个批次一次，Web 服务在启动时一次）；
+    页面中只引用样式表和脚本，不再内联，浏览器只需下载一次。内容未变化的文件不会重写。
+    """
+    output_dir = Path(output_dir)
+    for template_path, filename in _PAGE_STYLESHEETS.items():
+        css = template_stylesheet(template_path)
+        if css is not None:
+            _write_asset(output_dir / filename, css.encode('utf-8'))
+    for filename, script_path in _PAGE_SCRIPTS.values():
+        js = minify_js(_read_template(script_path))
+        _write_asset(output_dir / filename, js.encode('utf-8'))
+
+
+# HTML 压缩：脚本、样式、pre / textarea 块原样保留；其余部分中包含换行的空白（缩进、空行）合并为一个换行
+_HTML_TOKEN_RE = re.compile(r'(<(script|style|pre|textarea)\b.*?</\2>)|\s*\n\s*', re.DOTALL | re.IGNORECASE)
+
+
+def minify_html(html):
+    """去掉模板标记中的缩进和空行（连续空白在 HTML 中渲染效果相同，页面显示不变）"""
+    return _HTML_TOKEN_RE.sub(lambda m: m.group(1) or '\n', html)
+
+
+@lru_cache(maxsize=None)
+def load_template(template_path, replacements=()):
+    """
+    读取页面模板，并在第一个内联 <script> 标签处拆分为 (<script> 及之前部分, </script> 及之后部分)
+
+    每个模板在进程内只读取、拆分一次，批次中的每个页面只需按位置拼接片段。
+    replacements 为 ((原字符串, 新字符串), ...)，在拆分前应用到模板上。
+    配置了外置样式表的模板，内联 <style> 块替换为对样式表的引用（样式表由 write_static_assets 写入）；
+    模板对共享脚本源文件的引用替换为输出目录中的共享脚本（同样由 write_static_assets 写入）。
+    模板标记在拆分前压缩一次（见 minify_html），批次中的每个页面都直接复用压缩后的片段。
+    找不到内联脚本时返回 (模板, None)；模板中没有对其共享脚本源文件的引用时抛出 ValueError。
+    """
+    html = _read_template(template_path)
+    stylesheet = _PAGE_STYLESHEETS.get(template_path)
+    if stylesheet is not None:
+        html = _STYLE_RE.sub(lambda m: f'<link rel="stylesheet" href="{stylesheet}">', html, count=1)
+    script = _PAGE_SCRIPTS.get(template_path)
+    if script is not None:
+        filename, script_path = script
+        # src 是 URL 路径，按 POSIX 规则计算（os.path 在 Windows 上会生成反斜杠）
+        template_src = f'src="{posixpath.relpath(script_path, posixpath.dirname(template_path))}"'
+        if template_src not in html:
+            raise ValueError(f'{template_path} does not reference its shared script with {template_src}')
+        html = html.replace(template_src, f'src="{filename}"')
+    for old, new in replacements:
+        html = html.replace(old, new)
+    html = minify_html(html)
+    match = _SCRIPT_RE.search(html)
+    if match is None:
+        return html, None
+    return html[:match.end(1)], html[match.start(3):]
+
+
+def insert_script(template, script_parts):
+    """
+    将 script_parts 拼接到 load_template 拆分出的模板片段之间，返回页面片段列表
+
+    直接按位置拼接片段，不经过 re.sub 的替换模板解析（数据中的反斜杠不会被转义处理）。
+    """
+    head, tail = template
+    if tail is None:
+        return [head]
+    return [head, *script_parts, tail]
+
+
+def generate_main_page_parts(accounts, scores, tree_structure):
+    """生成主页面HTML，按片段返回（写文件时逐段写入，无需先拼成完整字符串）"""
+    # 读取模板（已缓存）
+    template = load_template('views/view_scores.html')
+    
+    # 过滤掉tweets数据，只保留基本字段
+    accounts_simple = [simplify_account(account) for account in accounts]
     
-    # 清理 comments 中的换行符，避免破坏 JavaScript 语法
-    def clean_comments(comments_data):
-        """清理 comments 中的换行符"""
-        if isinstance(comments_data, dict):
-            return {k: clean_comments(v) for k, v in comments_data.items()}
-        elif isinstance(comments_data, list):
-            return [clean_comments(item) for item in comments_data]
-        elif isinstance(comments_data, str):
-            # 将换行符、回车符替换为空格，并清理多余空格
-            cleaned = comments_data.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-            # 将多个连续空格替换为单个空格
-            while '  ' in cleaned:
-                cleaned = cleaned.replace('  ', ' ')
-            return cleaned.strip()
-        else:
-            return comments_data
+    # 主页面只需要叶节点的 key 和名称（表头、排序选项和每行的评分列），在生成时提取一次，
+    # 不再把整棵树内嵌到页面中由浏览器遍历
+    leaf_nodes = [{'key': leaf['key'], 'name': leaf['name']} for leaf in extract_leaf_nodes(tree_structure)]
     
-    cleaned_comments = clean_comments(comments)
+    # 页面默认按总分降序显示，在生成时排好这一顺序（账户下标列表），首次渲染无需在浏览器中排序。
+    # sorted 是稳定排序，同分账户保持原始顺序，与页面中的排序结果一致
+    root_scores = scores.get('root') or []
+    def root_score(index):
+        score = root_scores[index] if index < len(root_scores) else None
+        return score if score is not None else 0
+    root_order = sorted(range(len(accounts)), key=root_score, reverse=True)
     
-    # 将数据内嵌到JavaScript中
-    account_js = json.dumps(account_simple, ensure_ascii=False)
-    scores_js = json.dumps(scores, ensure_ascii=False)
-    comments_js = json.dumps(cleaned_comments, ensure_ascii=False)
-    tree_structure_js = json.dumps(tree_structure, ensure_ascii=False)
+    # 将数据内嵌到JavaScript中（以 JSON.parse 形式内嵌，浏览器解析更快）
+    accounts_js = to_js_parse(accounts_simple)
+    scores_js = to_js_parse(scores)
+    leaf_nodes_js = to_js_parse(leaf_nodes)
+    root_order_js = to_js_parse(root_order)
     
     # 替换fetch调用为内嵌数据
-    new_script = """
-        let account = """ + account_js + """;
-        let scores = """ + scores_js + """;
-        let comments = """ + comments_js + """;
-        let treeStructure = """ + tree_structure_js + """;
-        let userIndex = """ + str(user_index) + """;
-
-        // Get user index from URL (embedded, no need to get from URL)
-        function getUrlParams() {
-            return """ + str(user_index) + """;
-        }
-
-        // Load data (embedded, no fetch needed)
-        function loadData() {
-            try {
-                // Display user information
-                document.getElementById('username').textContent = account.username || 'Unknown';
-                document.getElementById('user_id').textContent = account.user_id || '-';
-                document.getElementById('followers_count').textContent = account.followers_count?.toLocaleString() || '-';
-                document.getElementById('friends_count').textContent = account.friends_count?.toLocaleString() || '-';
-                document.getElementById('tweets_count').textContent = account.tweets_count?.toLocaleString() || '-';
-                document.getElementById('description').textContent = account.description || '-';
-
-                // Display total score
-                const totalScore = scores.root?.[userIndex] ?? 0;
-                document.getElementById('totalScore').textContent = formatScore(totalScore);
-
-                // Display root node comment
-                const rootComment = comments.root?.[userIndex] || '';
-                document.getElementById('rootComment').textContent = rootComment || 'No comment available';
-
-                // Render tree structure (excluding root node, as it's already displayed above)
-                renderTree();
-
-                // Draw radar chart
-                renderRadarChart();
-
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('content').style.display = 'block';
-            } catch (error) {
-                document.getElementById('loading').style.display = 'none';
-                document.getElementById('error').style.display = 'block';
-                document.getElementById('error').textContent = `Error: ${error.message}`;
-            }
-        }
-
-        // Render tree node
-        function renderTreeNode(node, depth = 0) {
-            const score = scores[node.key]?.[userIndex] ?? 0;
-            const comment = comments[node.key]?.[userIndex] ?? "";
-            const isLeaf = node.is_leaf;
-            const hasChildren = node.children && node.children.length > 0;
-
-            const nodeDiv = document.createElement('div');
-            nodeDiv.className = `tree-node ${isLeaf ? 'leaf-node' : ''}`;
-            nodeDiv.style.marginLeft = `${depth * 20}px`;
-
-            let toggleButton = '';
-            if (hasChildren) {
-                toggleButton = `<div class="tree-toggle expanded" onclick="toggleNode(this)"></div>`;
-            } else {
-                toggleButton = `<div style="width: 24px; margin-right: 10px;"></div>`;
-            }
-
-            // Render child nodes first
-            let childrenHTML = '';
-            if (hasChildren) {
-                childrenHTML = node.children.map(child => renderTreeNode(child, depth + 1)).join('');
-            }
-
-            let descriptionHTML = '';
-            if (node.description) {
-                descriptionHTML = `<div class="tree-node-description">${escapeHtml(node.description)}</div>`;
-            }
-
-            let commentHTML = '';
-            if (comment) {
-                commentHTML = `<div class="tree-node-comment">${escapeHtml(comment)}</div>`;
-            }
-
-            nodeDiv.innerHTML = `
-                <div class="tree-node-content">
-                    ${toggleButton}
-                    <div class="tree-node-header">
-                        <div style="flex: 1;">
-                            <div>
-                                <span class="tree-node-name">${escapeHtml(node.name)}</span>
-                                <span class="tree-node-weight">(Weight: ${node.weight})</span>
-                            </div>
-                            ${descriptionHTML}
-                            ${commentHTML}
-                        </div>
-                    </div>
-                    <div class="tree-node-score">
-                        <div class="score-bar">
-                            <div class="score-bar-fill" style="width: ${score * 100}%"></div>
-                        </div>
-                        <div class="score-value">${formatScore(score)}</div>
-                    </div>
-                </div>
-                ${hasChildren ? `<div class="tree-children" id="children-${node.key}">${childrenHTML}</div>` : ''}
-            `;
-
-            return nodeDiv.outerHTML;
-        }
-
-        // Render entire tree (excluding root node, only render root's children)
-        function renderTree() {
-            const container = document.getElementById('treeContainer');
-            if (treeStructure && treeStructure.children && treeStructure.children.length > 0) {
-                // Only render root's children
-                const childrenHTML = treeStructure.children.map(child => renderTreeNode(child, 0)).join('');
-                container.innerHTML = childrenHTML;
-            } else {
-                container.innerHTML = '';
-            }
-        }
-
-        // Toggle node expand/collapse
-        function toggleNode(button) {
-            const nodeContent = button.closest('.tree-node-content');
-            const childrenDiv = nodeContent.nextElementSibling;
-            
-            if (childrenDiv && childrenDiv.classList.contains('tree-children')) {
-                const isCollapsed = childrenDiv.classList.contains('collapsed');
-                if (isCollapsed) {
-                    childrenDiv.classList.remove('collapsed');
-                    button.classList.remove('collapsed');
-                    button.classList.add('expanded');
-                } else {
-                    childrenDiv.classList.add('collapsed');
-                    button.classList.remove('expanded');
-                    button.classList.add('collapsed');
-                }
-            }
-        }
-
-        // Draw radar chart
-        let radarChart = null;
-        function renderRadarChart() {
-            if (!scores || userIndex === null) {
-                return;
-            }
-
-            const ctx = document.getElementById('radarChart');
-            if (!ctx) return;
-
-            // If chart already exists, destroy it first
-            if (radarChart) {
-                radarChart.destroy();
-            }
-
-            // Extract all leaf nodes from tree_structure
-            function extractLeafNodes(node) {
-                const leaves = [];
-                function traverse(n) {
-                    if (n.is_leaf) {
-                        leaves.push(n);
-                    } else if (n.children) {
-                        n.children.forEach(child => traverse(child));
-                    }
-                }
-                traverse(node);
-                return leaves;
-            }
-
-            const leafNodes = extractLeafNodes(treeStructure);
-            
-            // Dynamically get all leaf node scores for this user
-            const labels = [];
-            const data = [];
-            leafNodes.forEach(leaf => {
-                labels.push(leaf.name);
-                data.push(scores[leaf.key]?.[userIndex] ?? 0);
-            });
-
-            radarChart = new Chart(ctx, {
-                type: 'radar',
-                data: {
-                    labels: labels,
-                    datasets: [{
-                        label: 'KOL Metrics',
-                        data: data,
-                        backgroundColor: 'rgba(102, 126, 234, 0.2)',
-                        borderColor: 'rgba(102, 126, 234, 1)',
-                        borderWidth: 2,
-                        pointBackgroundColor: 'rgba(102, 126, 234, 1)',
-                        pointBorderColor: '#fff',
-                        pointHoverBackgroundColor: '#fff',
-                        pointHoverBorderColor: 'rgba(102, 126, 234, 1)'
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: true,
-                    scales: {
-                        r: {
-                            beginAtZero: true,
-                            min: 0,
-                            max: 1,
-                            ticks: {
-                                stepSize: 0.2,
-                                display: true
-                            },
-                            grid: {
-                                color: 'rgba(0, 0, 0, 0.1)'
-                            },
-                            pointLabels: {
-                                font: {
-                                    size: 12,
-                                    weight: 'bold'
-                                },
-                                color: '#333'
-                            }
-                        }
-                    },
-                    plugins: {
-                        legend: {
-                            display: true,
-                            position: 'bottom',
-                            labels: {
-                                font: {
-                                    size: 12
-                                },
-                                padding: 15
-                            }
-                        },
-                        tooltip: {
-                            callbacks: {
-                                label: function(context) {
-                                    return context.dataset.label + ': ' + (context.parsed.r * 100).toFixed(2) + '%';
-                                }
-                            }
-                        }
-                    }
-                }
-            });
-        }
-
-        // Format score
-        function formatScore(score) {
-            if (score === null || score === undefined) return '0.00%';
-            return (score * 100).toFixed(2) + '%';
-        }
-
-        // Escape HTML
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-
-        // Initialize - wait for DOM to load
-        if (document.readyState === "loading") {
-            document.addEventListener("DOMContentLoaded", loadData);
-        } else {
-            loadData();
-        }
+    new_script = [
+        """
+        let accounts = """, accounts_js, """;
+        let scores = """, scores_js, """;
+        let leafNodes = """, leaf_nodes_js, """;
+        let rootOrder = """, root_order_js, """;
+        function userPageHref(index) { return `user_${index}.html`; }
+    """]
+    
+    # 将模板中script标签的内容替换为内嵌数据，页面逻辑在共享的 view_scores.js 中
+    return insert_script(template, new_script)
+
+
+def generate_main_page(accounts, scores, tree_structure):
+    """生成主页面HTML"""
+    return ''.join(generate_main_page_parts(accounts, scores, tree_structure))
+
+
+def serialize_shared_data(scores, comments, tree_structure):
     """
+    将所有用户页面共享的数据序列化为内嵌 JS，返回 (scores_js, comments_js, tree_structure_js)
+
+    同一批次的 N 个用户页面中这些数据都相同，批次调用方只需序列化一次，再传给每个页面；
+    结果只在批次内持有，批次结束后随之释放。
+    comments 先清理换行符，避免破坏 JavaScript 语法；
+    较大的共享数据以 JSON.parse 形式内嵌，浏览器解析更快。
+    """
+    return (to_js_parse(scores),
+            to_js_parse(clean_comments(comments)),
+            to_js_parse(tree_structure))
+
+
+def generate_user_page_parts(account, scores, comments, tree_structure, user_index):
+    """生成单个用户页面HTML，按片段返回"""
+    return _user_page_parts(simplify_account(account),
+                            serialize_shared_data(scores, comments, tree_structure), user_index)
+
+
+def _user_page_parts(account_simple, shared_data_js, user_index):
+    """
+    按已精简的账户数据（simplify_account 的结果）和已序列化的共享数据（serialize_shared_data 的结果）
+    生成单个用户页面，按片段返回
+    """
+    # 读取模板（已缓存，返回按钮链接已替换为 index.html）
+    template = load_template('views/user_report.html',
+                             (('href="view_scores.html"', 'href="index.html"'),))
     
-    # 替换返回按钮链接
-    html = html.replace('href="view_scores.html"', 'href="index.html"')
+    # 单个账户的数据很小，直接内嵌对象字面量
+    account_js = to_js(account_simple)
+    scores_js, comments_js, tree_structure_js = shared_data_js
     
-    # 找到并替换script标签中的内容
-    import re
-    pattern = r'(<script>)(.*?)(</script>)'
-    replacement = f'\\1{new_script}\\3'
-    html = re.sub(pattern, replacement, html, flags=re.DOTALL)
+    # 替换fetch调用为内嵌数据
+    new_script = [
+        """
+        let account = """, account_js, """;
+        let scores = """, scores_js, """;
+        let comments = """, comments_js, """;
+        let treeStructure = """, tree_structure_js, """;
+        let userIndex = """, str(user_index), """;
+    """]
     
-    return html
+    # 将模板中script标签的内容替换为内嵌数据，页面逻辑在共享的 user_report.js 中
+    return insert_script(template, new_script)
+
+
+def generate_user_page(account, scores, comments, tree_structure, user_index):
+    """生成单个用户页面HTML"""
+    return ''.join(generate_user_page_parts(account, scores, comments, tree_structure, user_index))
+
+
+# 用户数达到该值时使用多进程生成用户页面（进程启动和数据传输有固定开销，用户少时单进程更快）
+PARALLEL_PAGE_THRESHOLD = 200
+
+# 工作进程内批次共享数据的序列化结果（serialize_shared_data 的返回值），由 _init_page_worker 设置
+_worker_shared_js = None
+
+
+def _init_page_worker(shared_data_js):
+    """工作进程初始化：已序列化的共享数据每个进程只接收一次，而不是随每个任务传输"""
+    global _worker_shared_js
+    _worker_shared_js = shared_data_js
+
+
+def _write_user_page_worker(job):
+    """在工作进程中生成并直接写入单个用户页面（页面内容不回传主进程）"""
+    account_simple, user_index, path = job
+    write_html_file(path, _user_page_parts(account_simple, _worker_shared_js, user_index))
+    return path
+
+
+def write_user_pages(accounts, scores, comments, tree_structure, output_dir, other_pages=()):
+    """
+    生成并写入所有用户页面 user_{i}.html，以及 other_pages 中的其他页面
+
+    用户数少于 PARALLEL_PAGE_THRESHOLD 时在当前进程生成，批次末尾并发写入；
+    否则使用多进程生成（页面生成主要是 Python 层的字符串/JSON 处理，受 GIL 限制，多线程无法加速），
+    每个工作进程各自缓存模板，并直接写入文件。
+    共享数据（scores / comments / tree_structure）在批次开始时只序列化一次，所有页面复用；
+    每个账户只精简一次（见 simplify_account），工作进程只接收精简后的账户数据，不传输 tweets。
+
+    Args:
+        other_pages: [(文件路径, HTML内容), ...]，与用户页面一起写入（如主页面）
+    """
+    output_dir = Path(output_dir)
+    pages = list(other_pages)
+    shared_data_js = serialize_shared_data(scores, comments, tree_structure)
+    accounts_simple = [simplify_account(account) for account in accounts]
+    if len(accounts_simple) < PARALLEL_PAGE_THRESHOLD:
+        for i, account_simple in enumerate(accounts_simple):
+            user_html = _user_page_parts(account_simple, shared_data_js, i)
+            pages.append((output_dir / f'user_{i}.html', user_html))
+    else:
+        jobs = [(account_simple, i, output_dir / f'user_{i}.html')
+                for i, account_simple in enumerate(accounts_simple)]
+        with ProcessPoolExecutor(initializer=_init_page_worker,
+                                 initargs=(shared_data_js,)) as executor:
+            for _ in executor.map(_write_user_page_worker, jobs, chunksize=16):
+                pass
+    asyncio.run(write_html_files(pages))
 
 
 def main():
     """主函数"""
-    import sys
-    import io
     # 设置标准输出为UTF-8编码，避免Windows终端编码问题
     if sys.platform == 'win32':
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -663,22 +562,20 @@ def main():
     output_dir.mkdir(exist_ok=True)
     print(f"Output directory: {output_dir.absolute()}")
     
+    # Write shared stylesheets and scripts once for the whole batch
+    write_static_assets(output_dir)
+    
     # Generate main page
     print("Generating main page...")
-    main_html = generate_main_page(accounts, scores, tree_structure)
-    with open(output_dir / 'index.html', 'w', encoding='utf-8') as f:
-        f.write(main_html)
-    print(f"  Generated: {output_dir / 'index.html'}")
+    main_page = (output_dir / 'index.html', generate_main_page_parts(accounts, scores, tree_structure))
     
-    # Generate pages for each user
+    # Generate pages for each user (multi-process for large batches), write together with the main page
     print(f"Generating user pages (total {len(accounts)})...")
+    write_user_pages(accounts, scores, comments, tree_structure, output_dir, other_pages=[main_page])
+    print(f"  Generated: {output_dir / 'index.html'}")
     for i, account in enumerate(accounts):
-        user_html = generate_user_page(account, scores, comments, tree_structure, i)
-        filename = f'user_{i}.html'
-        with open(output_dir / filename, 'w', encoding='utf-8') as f:
-            f.write(user_html)
         username = account.get('username', 'Unknown')
-        print(f"  Generated: {output_dir / filename} (User: {username})")
+        print(f"  Generated: {output_dir / f'user_{i}.html'} (User: {username})")
     
     print(f"\nComplete! All static HTML files saved to {output_dir.absolute()}")
     print(f"You can directly open {output_dir / 'index.html'} to view, no server needed")
@@ -1,7 +1,11 @@
+import sys
 from dataclasses import dataclass, field
 from typing import Optional, List
 
-@dataclass
+# 每批评分会创建大量 Tweet/Account 实例，Python 3.10+ 使用 __slots__ 减少内存占用、加快属性访问
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Tweet:
     tweet_id: str
     author_id: str
@@ -13,7 +17,7 @@ class Tweet:
     in_reply_to_status_id_str: Optional[str] = None
     is_quote_status: Optional[int] = 0
     
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Account:
     user_id: str
     username: Optional[str] = '无名大侠'
@@ -3,6 +3,7 @@ import json
 import os
 import asyncio
 import inspect
+import operator
 from dataclasses import fields
 from models.data_model import Account
 from models.score_node import ScoreNode
@@ -10,6 +11,40 @@ from utils import call_gpt
 from scoring.normalization_manager import NormalizationManager
 
 
+# 根节点评论中展示的 Account 字段（排除 tweets 等不需要的字段）及字段值为 None 时的默认值
+# 字段列表在导入时确定，避免每次生成评论都重新遍历 dataclass 字段
+_ACCOUNT_INFO_EXCLUDED_FIELDS = {'tweets', 'user_id'}
+_ACCOUNT_INFO_FIELDS = tuple(
+    (f.name, 'N/A' if f.type == str or (hasattr(f.type, '__origin__') and f.type.__origin__ is str) else 0)
+    for f in fields(Account) if f.name not in _ACCOUNT_INFO_EXCLUDED_FIELDS
+)
+_get_account_info_values = operator.attrgetter(*(name for name, _ in _ACCOUNT_INFO_FIELDS))
+
+# 根节点评论中账号信息行和各维度得分行的模板（% 格式化）
+_ACCOUNT_INFO_LINE = "- %s: %s"
+_NORMALIZED_DIMENSION_LINE = "- %s (%s): Score %s [Normalized], Comment: %s"
+_RAW_DIMENSION_LINE = "- %s (%s): Score %.2f [Raw Score], Comment: %s"
+
+# 根节点评论的提示词模板（模块级常量，生成时用 format_map 填充）
+_ROOT_COMMENT_PROMPT_TEMPLATE = """Please generate an overall comment based on the following KOL's comprehensive scoring information.
+
+Account Information:
+{account_info}
+
+Dimension Scores:
+{dimension_info}
+
+Overall Score (Root node score, normalized): {root_score:.2%}
+
+Please generate a comprehensive comment summarizing this KOL's overall performance, including strengths, weaknesses, and recommendations. The comment should:
+1. Be concise and clear (100-200 words)
+2. Be based on scores and comments from each dimension
+3. Provide valuable insights
+4. Be written in English
+
+Please return the comment content directly without any additional formatting."""
+
+
 # 使用 DFS 迭代寻找 leaf_nodes
 def find_leaf_nodes(node: ScoreNode):
     leaf_nodes = []
@@ -36,21 +71,37 @@ def post_order_traversal(node: ScoreNode) -> List[tuple[ScoreNode, int]]:
     return nodes_with_depth
 
 
-async def generate_root_comment(account: Account, account_idx: int, root_score: float, root: ScoreNode, scores: dict, comments: dict, normalization_params: dict) -> str:
-    """为根节点生成AI评论"""
+def weighted_average(node: ScoreNode, scores: dict, num_accounts: int) -> List[float]:
+    """按子节点归一化后的权重，计算非叶节点每个账号的加权平均分"""
+    total_weight = sum(child.weight for child in node.children)
+    if total_weight > 0:
+        normalized_weights = {child.key: child.weight / total_weight for child in node.children}
+    else:
+        normalized_weights = {child.key: 0.0 for child in node.children}
+    
+    # 按子节点逐列累加，避免逐账号、逐子节点的字典查找
+    weighted_sums = [0.0] * num_accounts
+    for child in node.children:
+        child_normalized_weight = normalized_weights[child.key]
+        weighted_sums = [
+            weighted_sum + child_score * child_normalized_weight
+            for weighted_sum, child_score in zip(weighted_sums, scores[child.key])
+        ]
+    return weighted_sums
+
+
+async def generate_root_comment(account: Account, account_idx: int, root_score: float, root: ScoreNode, scores: dict, comments: dict, normalization_params: dict,
+                                leaf_nodes: Optional[List[ScoreNode]] = None) -> str:
+    """为根节点生成AI评论（leaf_nodes 可由调用方预先计算后传入，批量生成时避免每个账号重复遍历评分树）"""
     try:
         # 动态获取所有叶节点
-        leaf_nodes = find_leaf_nodes(root)
+        if leaf_nodes is None:
+            leaf_nodes = find_leaf_nodes(root)
         
-        # 动态获取Account字段（排除tweets等不需要的字段）
-        account_fields_to_exclude = {'tweets', 'user_id'}  # 排除的字段
+        # 获取Account字段（字段列表已在导入时预先计算）
         account_info_list = []
-        for field in fields(Account):
-            if field.name not in account_fields_to_exclude:
-                value = getattr(account, field.name, None)
-                if value is None:
-                    value = 'N/A' if field.type == str or (hasattr(field.type, '__origin__') and field.type.__origin__ is str) else 0
-                account_info_list.append(f"- {field.name}: {value}")
+        for (name, default), value in zip(_ACCOUNT_INFO_FIELDS, _get_account_info_values(account)):
+            account_info_list.append(_ACCOUNT_INFO_LINE % (name, default if value is None else value))
         account_info = "\n".join(account_info_list)
         
         # Dynamically get scores and comments for each dimension
@@ -63,29 +114,19 @@ async def generate_root_comment(account: Account, account_idx: int, root_score:
                 comment = comments[key][account_idx] if account_idx < len(comments[key]) else ""
                 # Check if normalized: directly use leaf_node.normalize attribute
                 is_normalized = leaf_node.normalize
-                score_label = f"{score:.2%}" if is_normalized else f"{score:.2f}"
-                dimension_info_list.append(f"- {name} ({key}): Score {score_label}" + (" [Normalized]" if is_normalized else " [Raw Score]") + f", Comment: {comment}")
+                if is_normalized:
+                    dimension_info_list.append(_NORMALIZED_DIMENSION_LINE % (name, key, format(score, '.2%'), comment))
+                else:
+                    dimension_info_list.append(_RAW_DIMENSION_LINE % (name, key, score, comment))
         
         dimension_info = "\n".join(dimension_info_list)
         
         # Build prompt
-        prompt = f"""Please generate an overall comment based on the following KOL's comprehensive scoring information.
-
-Account Information:
-{account_info}
-
-Dimension Scores:
-{dimension_info}
-
-Overall Score (Root node score, normalized): {root_score:.2%}
-
-Please generate a comprehensive comment summarizing this KOL's overall performance, including strengths, weaknesses, and recommendations. The comment should:
-1. Be concise and clear (100-200 words)
-2. Be based on scores and comments from each dimension
-3. Provide valuable insights
-4. Be written in English
-
-Please return the comment content directly without any additional formatting."""
+        prompt = _ROOT_COMMENT_PROMPT_TEMPLATE.format_map({
+            'account_info': account_info,
+            'dimension_info': dimension_info,
+            'root_score': root_score,
+        })
         
         result = await call_gpt(prompt, None)  # Don't use json_schema, return text directly
         if isinstance(result, dict):
@@ -108,6 +149,16 @@ async def calculate(accounts: List[Account], root: ScoreNode,
         normalization_manager: 归一化参数管理器（如果提供，将使用已有的归一化参数）
         save_history: 是否保存原始分数到历史记录
     """
+    # 没有账号时直接返回空结果（无需加载归一化参数、写历史记录；也避免对空列表求 min/max）
+    if not accounts:
+        empty = {node.key: [] for node, _ in post_order_traversal(root)}
+        return {
+            "raw_scores": {key: [] for key in empty},
+            "normalization_params": {},
+            "scores": empty,
+            "comments": {key: [] for key in empty}
+        }
+    
     # 初始化归一化管理器
     if normalization_manager is None:
         normalization_manager = NormalizationManager()
@@ -122,19 +173,14 @@ async def calculate(accounts: List[Account], root: ScoreNode,
         if leaf_node.calc_raw is None:
             return (0.0, "")
         
-        # 兼容同步和异步函数
-        if inspect.iscoroutinefunction(leaf_node.calc_raw):
-            try:
-                result = await leaf_node.calc_raw(account)
-            except Exception as e:
-                print(f"计算叶节点 {leaf_node.key} 得分时发生错误: {e}")
-                return (0.0, "")
-        else:
-            try:
-                result = leaf_node.calc_raw(account)
-            except Exception as e:
-                print(f"计算叶节点 {leaf_node.key} 得分时发生错误: {e}")
-                return (0.0, "")
+        # 兼容同步和异步函数：调用一次，返回可等待对象时再 await
+        try:
+            result = leaf_node.calc_raw(account)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            print(f"计算叶节点 {leaf_node.key} 得分时发生错误: {e}")
+            return (0.0, "")
         
         # 处理返回格式：可能是 float 或 (float, str) 元组
         if isinstance(result, tuple) and len(result) == 2:
@@ -159,124 +205,105 @@ async def calculate(accounts: List[Account], root: ScoreNode,
         comments[leaf_node.key] = leaf_comments
         raw_scores[leaf_node.key] = leaf_scores.copy()  # 保存原始分
     
-    # 保存原始分数到历史记录
+    # 保存原始分数到历史记录（文件读写放到线程中执行，与后续归一化和根节点评论生成并行，不阻塞事件循环）
+    history_task = None
     if save_history:
         # 提取用户名列表
         usernames = [getattr(account, 'username', f'user_{idx}') for idx, account in enumerate(accounts)]
-        normalization_manager.save_history(raw_scores, usernames)
+        history_snapshot = {key: list(values) for key, values in raw_scores.items()}
+        history_task = asyncio.create_task(
+            asyncio.to_thread(normalization_manager.save_history, history_snapshot, usernames)
+        )
     
-    # 3. 叶节点归一化（只对normalize为True的叶节点生效）
-    for leaf_node in leaf_nodes:
-        if leaf_node.normalize:
-            leaf_key = leaf_node.key
-            
-            # 检查是否有已有的归一化参数
-            if leaf_key in normalization_manager.normalization_params:
-                # 使用已有的归一化参数
-                params = normalization_manager.normalization_params[leaf_key]
-                min_score = params.get("min", 0.0)
-                max_score = params.get("max", 1.0)
-                normalization_params[leaf_key] = {"min": min_score, "max": max_score}
-                
-                # 使用已有参数进行归一化
-                if max_score == min_score:
-                    scores[leaf_key] = [0.0] * len(scores[leaf_key])
-                else:
-                    scores[leaf_key] = [
-                        normalization_manager.normalize_score(leaf_key, raw_score)
-                        for raw_score in raw_scores[leaf_key]
-                    ]
-                print(f"   使用已有归一化参数: {leaf_key} (min={min_score:.4f}, max={max_score:.4f})")
-            else:
-                # 使用当前批次数据计算归一化参数
-                min_score = min(raw_scores[leaf_key])
-                max_score = max(raw_scores[leaf_key])
-                normalization_params[leaf_key] = {"min": min_score, "max": max_score}
+    # 历史记录写入期间计算若抛出异常，也要等待写入结束，避免任务未被等待、异常丢失
+    try:
+        # 3. 叶节点归一化（只对normalize为True的叶节点生效）
+        for leaf_node in leaf_nodes:
+            if leaf_node.normalize:
+                leaf_key = leaf_node.key
                 
-                if max_score == min_score:
-                    scores[leaf_key] = [0.0] * len(scores[leaf_key])
+                # 检查是否有已有的归一化参数
+                if leaf_key in normalization_manager.normalization_params:
+                    # 使用已有的归一化参数
+                    params = normalization_manager.normalization_params[leaf_key]
+                    min_score = params.get("min", 0.0)
+                    max_score = params.get("max", 1.0)
+                    normalization_params[leaf_key] = {"min": min_score, "max": max_score}
+                    
+                    # 使用已有参数进行归一化
+                    if max_score == min_score:
+                        scores[leaf_key] = [0.0] * len(scores[leaf_key])
+                    else:
+                        # 与 normalization_manager.normalize_score 相同的计算（限制在 0-1 范围内），
+                        # 参数已在上面取出，循环内不再逐个调用方法、重复查找参数
+                        score_range = max_score - min_score
+                        scores[leaf_key] = [
+                            max(0.0, min(1.0, (raw_score - min_score) / score_range))
+                            for raw_score in raw_scores[leaf_key]
+                        ]
+                    print(f"   使用已有归一化参数: {leaf_key} (min={min_score:.4f}, max={max_score:.4f})")
                 else:
-                    scores[leaf_key] = [(s - min_score) / (max_score - min_score) for s in raw_scores[leaf_key]]
-                print(f"   使用当前批次计算归一化参数: {leaf_key} (min={min_score:.4f}, max={max_score:.4f})")
-    
-    # 4. 递归计算所有节点的得分（从下往上）
-    nodes_with_depth = post_order_traversal(root)
+                    # 使用当前批次数据计算归一化参数
+                    min_score = min(raw_scores[leaf_key])
+                    max_score = max(raw_scores[leaf_key])
+                    normalization_params[leaf_key] = {"min": min_score, "max": max_score}
+                    
+                    if max_score == min_score:
+                        scores[leaf_key] = [0.0] * len(scores[leaf_key])
+                    else:
+                        scores[leaf_key] = [(s - min_score) / (max_score - min_score) for s in raw_scores[leaf_key]]
+                    print(f"   使用当前批次计算归一化参数: {leaf_key} (min={min_score:.4f}, max={max_score:.4f})")
+        
+        # 4. 递归计算所有节点的得分（从下往上）
+        nodes_with_depth = post_order_traversal(root)
 
-    # 初始化所有节点的得分和评语
-    for node, _ in nodes_with_depth:
-        if node.key not in scores:
-            scores[node.key] = [0.0] * len(accounts)
-        if node.key not in comments:
-            comments[node.key] = [""] * len(accounts)
-        # 非叶节点的原始分初始化为0（会在计算时填充）
-        if node.key not in raw_scores:
-            raw_scores[node.key] = [0.0] * len(accounts)
-    
-    # 从下往上计算非叶节点的得分
-    for node, _ in nodes_with_depth:
-        if not node.is_leaf():
-            # 特殊处理：根节点使用乘法计算 (other_factors的平均 × human_vitality)
-            if node.key == "root" and len(node.children) == 2:
-                # 找到other_factors和human_vitality节点
+        # 初始化所有节点的得分和评语
+        for node, _ in nodes_with_depth:
+            if node.key not in scores:
+                scores[node.key] = [0.0] * len(accounts)
+            if node.key not in comments:
+                comments[node.key] = [""] * len(accounts)
+            # 非叶节点的原始分初始化为0（会在计算时填充）
+            if node.key not in raw_scores:
+                raw_scores[node.key] = [0.0] * len(accounts)
+        
+        # 从下往上计算非叶节点的得分
+        for node, _ in nodes_with_depth:
+            if not node.is_leaf():
                 other_factors_child = None
                 human_vitality_child = None
-                for child in node.children:
-                    if child.key == "other_factors":
-                        other_factors_child = child
-                    elif child.key == "human_vitality":
-                        human_vitality_child = child
+                # 特殊处理：根节点使用乘法计算 (other_factors的平均 × human_vitality)
+                if node.key == "root" and len(node.children) == 2:
+                    # 找到other_factors和human_vitality节点
+                    children_by_key = {child.key: child for child in node.children}
+                    other_factors_child = children_by_key.get("other_factors")
+                    human_vitality_child = children_by_key.get("human_vitality")
                 
                 if other_factors_child and human_vitality_child:
-                    # 根节点得分 = other_factors得分 × human_vitality得分
-                    for account_idx in range(len(accounts)):
-                        other_factors_score = scores[other_factors_child.key][account_idx]
-                        human_vitality_score = scores[human_vitality_child.key][account_idx]
-                        final_score = other_factors_score * human_vitality_score
-                        scores[node.key][account_idx] = final_score
-                        raw_scores[node.key][account_idx] = final_score
-                else:
-                    # 如果找不到两个子节点，使用加权平均
-                    total_weight = sum(child.weight for child in node.children)
-                    if total_weight > 0:
-                        normalized_weights = {child.key: child.weight / total_weight for child in node.children}
-                    else:
-                        normalized_weights = {child.key: 0.0 for child in node.children}
-                    
-                    for account_idx in range(len(accounts)):
-                        weighted_sum = 0.0
-                        for child in node.children:
-                            child_score = scores[child.key][account_idx]
-                            child_normalized_weight = normalized_weights[child.key]
-                            weighted_sum += child_score * child_normalized_weight
-                        scores[node.key][account_idx] = weighted_sum
-                        raw_scores[node.key][account_idx] = weighted_sum
-            else:
-                # 其他非叶节点使用加权平均（归一化weight）
-                total_weight = sum(child.weight for child in node.children)
-                if total_weight > 0:
-                    normalized_weights = {child.key: child.weight / total_weight for child in node.children}
+                    # 根节点得分 = other_factors得分 × human_vitality得分（按列整体计算）
+                    node_scores = [
+                        other_factors_score * human_vitality_score
+                        for other_factors_score, human_vitality_score
+                        in zip(scores[other_factors_child.key], scores[human_vitality_child.key])
+                    ]
                 else:
-                    normalized_weights = {child.key: 0.0 for child in node.children}
-                
-                # 计算每个账户的得分
-                for account_idx in range(len(accounts)):
-                    weighted_sum = 0.0
-                    for child in node.children:
-                        child_score = scores[child.key][account_idx]
-                        child_normalized_weight = normalized_weights[child.key]
-                        weighted_sum += child_score * child_normalized_weight
-                    scores[node.key][account_idx] = weighted_sum
-                    raw_scores[node.key][account_idx] = weighted_sum  # 非叶节点的原始分等于归一化后的分数（因为不进行归一化）
-    
-    # 5. 为根节点生成AI评论
-    if "root" in scores:
-        # 并发为每个账号生成评论
-        tasks = [
-            generate_root_comment(account, idx, scores["root"][idx], root, scores, comments, normalization_params)
-            for idx, account in enumerate(accounts)
-        ]
-        root_comments = await asyncio.gather(*tasks)
-        comments["root"] = list(root_comments)
+                    # 其他非叶节点（以及找不到两个子节点的根节点）使用加权平均（归一化weight）
+                    node_scores = weighted_average(node, scores, len(accounts))
+                scores[node.key] = node_scores
+                raw_scores[node.key] = list(node_scores)  # 非叶节点的原始分等于归一化后的分数（因为不进行归一化）
+        
+        # 5. 为根节点生成AI评论
+        if "root" in scores:
+            # 并发为每个账号生成评论
+            tasks = [
+                generate_root_comment(account, idx, scores["root"][idx], root, scores, comments, normalization_params, leaf_nodes)
+                for idx, account in enumerate(accounts)
+            ]
+            root_comments = await asyncio.gather(*tasks)
+            comments["root"] = list(root_comments)
+    finally:
+        if history_task is not None:
+            await history_task
     
     return {
         "raw_scores": raw_scores,
@@ -4,6 +4,7 @@ from models.score_node import ScoreNode
 from utils import call_gpt
 
 # 辅助函数：根据分数段生成默认评语
+# 各维度的阈值与评语定义为模块级常量，避免每次评分时重新构建
 def get_default_comment(score: float, thresholds: list, comments: list) -> str:
     """根据分数段返回默认评语"""
     for i, threshold in enumerate(thresholds):
@@ -11,7 +12,26 @@ def get_default_comment(score: float, thresholds: list, comments: list) -> str:
             return comments[i]
     return comments[-1]
 
+def _tweet_totals(tweets) -> tuple:
+    """一次遍历同时统计总浏览量和总互动数（likes + retweets + replies）"""
+    total_views = 0
+    total_interactions = 0
+    for t in tweets:
+        if t.views_count:
+            total_views += t.views_count
+        total_interactions += t.likes_count + t.retweets_count + t.replies_count
+    return total_views, total_interactions
+
 # 1. Originality - 原创性
+_ORIGINALITY_THRESHOLDS = (0.8, 0.6, 0.4, 0.2)
+_ORIGINALITY_COMMENTS = (
+    "Excellent: Content is primarily original, almost never reposts",
+    "Good: Mostly original content with occasional sharing",
+    "Average: Balance of original and shared content",
+    "Fair: Mostly shares with limited original content",
+    "Poor: Almost no original content, mainly reposts"
+)
+
 def originality_score(account: Account):
     if not account.tweets:
         return (0.0, "No tweet data")
@@ -36,15 +56,7 @@ def originality_score(account: Account):
     score = originality_ratio
     
     # 根据分数段生成评语
-    thresholds = [0.8, 0.6, 0.4, 0.2]
-    comments = [
-        "Excellent: Content is primarily original, almost never reposts",
-        "Good: Mostly original content with occasional sharing",
-        "Average: Balance of original and shared content",
-        "Fair: Mostly shares with limited original content",
-        "Poor: Almost no original content, mainly reposts"
-    ]
-    comment = get_default_comment(score, thresholds, comments)
+    comment = get_default_comment(score, _ORIGINALITY_THRESHOLDS, _ORIGINALITY_COMMENTS)
     comment = f"{comment} (Original tweets: {original_count}/{total_tweets}, Ratio: {originality_ratio:.2f})"
     
     return (score, comment)
@@ -64,12 +76,11 @@ async def bot_impact_score(account: Account):
         return (0.0, "No tweet data")
     
     # Calculate views/follower ratio
-    total_views = sum(t.views_count for t in account.tweets if t.views_count)
+    total_views, total_interactions = _tweet_totals(account.tweets)
     avg_views_per_tweet = total_views / len(account.tweets) if account.tweets else 0
     views_follower_ratio = avg_views_per_tweet / account.followers_count if account.followers_count > 0 else 0
     
     # Calculate engagement rate
-    total_interactions = sum(t.likes_count + t.retweets_count + t.replies_count for t in account.tweets)
     engagement_rate = total_interactions / total_views if total_views > 0 else 0
     
     # Use LLM to evaluate bot activity
@@ -161,12 +172,20 @@ content_depth_node = ScoreNode(
 )
 
 # 5. Engagement - 参与度
+_ENGAGEMENT_THRESHOLDS = (0.08, 0.06, 0.04, 0.02)
+_ENGAGEMENT_COMMENTS = (
+    "Extremely high engagement, active audience interaction",
+    "Good engagement, moderate audience interaction",
+    "Average engagement",
+    "Low engagement",
+    "Very low engagement"
+)
+
 def engagement_score(account: Account):
     if not account.tweets:
         return (0.0, "No tweet data")
     
-    total_interactions = sum(t.likes_count + t.retweets_count + t.replies_count for t in account.tweets)
-    total_views = sum(t.views_count for t in account.tweets if t.views_count)
+    total_views, total_interactions = _tweet_totals(account.tweets)
     
     if total_views == 0:
         return (0.0, "No view count data")
@@ -177,15 +196,7 @@ def engagement_score(account: Account):
     # 这里直接返回原始比例，归一化会在engine中完成
     score = engagement_rate * 1000  # 放大以便区分
     
-    thresholds = [0.08, 0.06, 0.04, 0.02]
-    comments = [
-        "Extremely high engagement, active audience interaction",
-        "Good engagement, moderate audience interaction",
-        "Average engagement",
-        "Low engagement",
-        "Very low engagement"
-    ]
-    comment = get_default_comment(engagement_rate, thresholds, comments)
+    comment = get_default_comment(engagement_rate, _ENGAGEMENT_THRESHOLDS, _ENGAGEMENT_COMMENTS)
     
     return (score, comment)
 
@@ -198,6 +209,17 @@ engagement_node = ScoreNode(
 )
 
 # 6. Views - 浏览量
+# thresholds基于对数变换后的值，分布情况：典型KOL范围约在5.5-9.5之间
+# log(1000+1)≈6.9, log(10000+1)≈9.2, log(100000+1)≈11.5
+_VIEWS_THRESHOLDS = (8.5, 7.5, 6.5, 5.5)
+_VIEWS_COMMENTS = (
+    "Extremely high views with broad reach. Average views per tweet typically in the tens of thousands, ranking in the top 10-15% of KOLs, demonstrating strong content dissemination and influence, capable of reaching large target audiences, suitable for brand promotion and large-scale marketing campaigns.",
+    "High views with good reach. Average views per tweet typically in the thousands to tens of thousands, ranking in the top 30-40% of KOLs, good content dissemination effectiveness, capable of effectively reaching target audience groups, with certain brand promotion value.",
+    "Moderate views with stable reach. Average views per tweet typically in the hundreds to thousands, ranking in the middle tier of KOLs (approximately 30-60th percentile), stable content dissemination effectiveness, capable of covering a certain scale of audience, suitable for vertical field precision marketing.",
+    "Low views with limited reach. Average views per tweet typically in the tens to hundreds, ranking in the lower-middle tier of KOLs (approximately 60-80th percentile), relatively limited content dissemination range, mainly targeting specific small-scale audience groups, more suitable for niche field deep operations.",
+    "Very low views with minimal reach. Average views per tweet typically in single digits to tens, ranking in the bottom 20% of KOLs, very limited content dissemination range, small influence, may need to improve exposure through content optimization or platform operations."
+)
+
 def views_score(account: Account):
     if not account.tweets:
         return (0.0, "No tweet data")
@@ -212,17 +234,7 @@ def views_score(account: Account):
     log_views = math.log(avg_views + 1)
     
     # 返回对数变换后的值，归一化会在engine中完成
-    # thresholds基于对数变换后的值，分布情况：典型KOL范围约在5.5-9.5之间
-    # log(1000+1)≈6.9, log(10000+1)≈9.2, log(100000+1)≈11.5
-    thresholds = [8.5, 7.5, 6.5, 5.5]
-    comments = [
-        "Extremely high views with broad reach. Average views per tweet typically in the tens of thousands, ranking in the top 10-15% of KOLs, demonstrating strong content dissemination and influence, capable of reaching large target audiences, suitable for brand promotion and large-scale marketing campaigns.",
-        "High views with good reach. Average views per tweet typically in the thousands to tens of thousands, ranking in the top 30-40% of KOLs, good content dissemination effectiveness, capable of effectively reaching target audience groups, with certain brand promotion value.",
-        "Moderate views with stable reach. Average views per tweet typically in the hundreds to thousands, ranking in the middle tier of KOLs (approximately 30-60th percentile), stable content dissemination effectiveness, capable of covering a certain scale of audience, suitable for vertical field precision marketing.",
-        "Low views with limited reach. Average views per tweet typically in the tens to hundreds, ranking in the lower-middle tier of KOLs (approximately 60-80th percentile), relatively limited content dissemination range, mainly targeting specific small-scale audience groups, more suitable for niche field deep operations.",
-        "Very low views with minimal reach. Average views per tweet typically in single digits to tens, ranking in the bottom 20% of KOLs, very limited content dissemination range, small influence, may need to improve exposure through content optimization or platform operations."
-    ]
-    comment = get_default_comment(log_views, thresholds, comments)
+    comment = get_default_comment(log_views, _VIEWS_THRESHOLDS, _VIEWS_COMMENTS)
     
     return (log_views, comment)
 
@@ -24,6 +24,7 @@ import logging
 import sqlite3
 import time
 import os
+import re
 import traceback
 from datetime import datetime
 from email.utils import parsedate_to_datetime
@@ -33,11 +34,15 @@ import urllib3
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Twitter 用户名规则：1-15 位字母、数字或下划线
+_USERNAME_RE = re.compile(r'[A-Za-z0-9_]{1,15}')
+
 
 class TwitterCrawler:
     """Twitter 爬虫类 - 整合用户信息获取和推文抓取"""
     
-    def __init__(self, api_key: str, output_dir: str = ".", db_name: str = "twitter_data.db"):
+    def __init__(self, api_key: str, output_dir: str = ".", db_name: str = "twitter_data.db",
+                 comment_concurrency: int = 1):
         """
         初始化爬虫
         
@@ -45,11 +50,13 @@ class TwitterCrawler:
             api_key: TweetScout API 密钥
             output_dir: 输出目录（默认当前目录）
             db_name: 数据库文件名（默认 twitter_data.db）
+            comment_concurrency: 同时获取评论的推文数（默认 1，即逐条获取；调大前请确认 API 速率限制）
         """
         self.api_key = api_key
         self.base_url = "https://api.tweetscout.io/v2"
         self.output_dir = output_dir
         self.db_path = os.path.join(output_dir, db_name)
+        self.comment_concurrency = max(1, comment_concurrency)
         
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
@@ -214,6 +221,10 @@ class TwitterCrawler:
         Returns:
             用户信息字典，包含 id, screen_name, followers_count 等
         """
+        if not _USERNAME_RE.fullmatch(username or ''):
+            self.logger.warning(f"用户名格式无效: {username!r}")
+            return {}
+        
         try:
             url = f"{self.base_url}/info/{username}"
             
@@ -401,8 +412,11 @@ class TwitterCrawler:
             query = f"conversation_id:{conversation_id}"
             next_cursor = ""
             max_comment_pages = 5  # 限制页数
+            max_rate_limit_retries = 3  # 同一页遇到速率限制时的最大重试次数
             
-            for page in range(max_comment_pages):
+            page = 0
+            rate_limit_retries = 0
+            while page < max_comment_pages:
                 data = {
                     "query": query,
                     "next_cursor": next_cursor
@@ -424,10 +438,10 @@ class TwitterCrawler:
                             if not comments:
                                 break
                             
-                            # 过滤原始推文
+                            # 过滤原始推文（以及没有 id_str、无法入库的评论）
                             filtered_comments = [
                                 c for c in comments
-                                if c.get("id_str") != tweet_id and c.get("conversation_id_str") == conversation_id
+                                if c.get("id_str") and c.get("id_str") != tweet_id and c.get("conversation_id_str") == conversation_id
                             ]
                             all_comments.extend(filtered_comments)
                             
@@ -435,13 +449,19 @@ class TwitterCrawler:
                             if not next_cursor:
                                 break
                             
+                            page += 1
+                            rate_limit_retries = 0
                             await asyncio.sleep(2)
                             
                         elif response.status == 429:
-                            retry_after = int(response.headers.get('Retry-After', 60))
-                            self.logger.warning(f"速率限制 (429) 获取评论，等待 {retry_after} 秒...")
+                            # 速率限制：退避后重试同一页（不消耗页数），多次重试仍失败时放弃并记录
+                            rate_limit_retries += 1
+                            if rate_limit_retries > max_rate_limit_retries:
+                                self.logger.error(f"获取推文 {tweet_id} 的评论多次遇到速率限制，已放弃剩余页（已获取 {len(all_comments)} 条）")
+                                break
+                            retry_after = int(response.headers.get('Retry-After', 60 * 2 ** (rate_limit_retries - 1)))
+                            self.logger.warning(f"速率限制 (429) 获取评论，等待 {retry_after} 秒后重试 ({rate_limit_retries}/{max_rate_limit_retries})...")
                             await asyncio.sleep(retry_after)
-                            continue
                         else:
                             break
                             
@@ -472,10 +492,14 @@ class TwitterCrawler:
                     self.logger.warning(f"无法解析推文日期: {created_at_str}")
             
             # 序列化复杂对象
-            entities_json = json.dumps(tweet_data.get('entities'), ensure_ascii=False) if tweet_data.get('entities') else None
-            quoted_status_json = json.dumps(tweet_data.get('quoted_status'), ensure_ascii=False) if tweet_data.get('quoted_status') else None
-            retweeted_status_json = json.dumps(tweet_data.get('retweeted_status'), ensure_ascii=False) if tweet_data.get('retweeted_status') else None
-            user_json = json.dumps(tweet_data.get('user'), ensure_ascii=False) if tweet_data.get('user') else None
+            entities = tweet_data.get('entities')
+            quoted_status = tweet_data.get('quoted_status')
+            retweeted_status = tweet_data.get('retweeted_status')
+            user = tweet_data.get('user')
+            entities_json = json.dumps(entities, ensure_ascii=False) if entities else None
+            quoted_status_json = json.dumps(quoted_status, ensure_ascii=False) if quoted_status else None
+            retweeted_status_json = json.dumps(retweeted_status, ensure_ascii=False) if retweeted_status else None
+            user_json = json.dumps(user, ensure_ascii=False) if user else None
             
             # 尝试多种可能的字段名来获取浏览量数据
             view_count = 0
@@ -498,13 +522,13 @@ class TwitterCrawler:
                 view_count = 0
             
             # 如果仍然没有获取到浏览量数据，记录警告（仅对前几条推文记录，避免日志过多）
-            if view_count == 0 and len([k for k in tweet_data.keys() if 'view' in k.lower() or 'impression' in k.lower()]) == 0:
-                # 只在第一次遇到这种情况时记录详细日志
-                if not hasattr(self, '_view_count_warning_logged'):
-                    self.logger.warning(f"未找到浏览量数据字段。推文数据中的可用字段: {list(tweet_data.keys())[:10]}")
-                    if public_metrics:
-                        self.logger.warning(f"public_metrics 中的字段: {list(public_metrics.keys())}")
-                    self._view_count_warning_logged = True
+            # 只在第一次遇到这种情况时记录详细日志（先检查标记，已记录过就不再扫描字段名）
+            if (view_count == 0 and not hasattr(self, '_view_count_warning_logged')
+                    and not any('view' in k.lower() or 'impression' in k.lower() for k in tweet_data)):
+                self.logger.warning(f"未找到浏览量数据字段。推文数据中的可用字段: {list(tweet_data.keys())[:10]}")
+                if public_metrics:
+                    self.logger.warning(f"public_metrics 中的字段: {list(public_metrics.keys())}")
+                self._view_count_warning_logged = True
             
             self.cursor.execute('''
                 INSERT OR REPLACE INTO tweets
@@ -590,23 +614,36 @@ class TwitterCrawler:
                 tweets = await self.get_user_tweets(user_id, max_tweets, session)
                 self.logger.info(f"为用户 {username} 找到 {len(tweets)} 条推文")
                 
+                # 没有 id_str 的推文无法入库（tweet_id NOT NULL），提前过滤，省去日期解析和序列化
+                tweets = [tweet for tweet in tweets if tweet.get("id_str")]
+                
                 for tweet in tweets:
                     # 保存推文
                     self.save_tweet(user_info, tweet)
+                
+                # 如果需要抓取评论：最多 comment_concurrency 条推文同时获取（默认逐条获取），保存仍按推文顺序串行执行
+                if not skip_comments:
+                    targets = [
+                        (tweet["id_str"], tweet.get("conversation_id_str"))
+                        for tweet in tweets
+                        if tweet.get("conversation_id_str") and tweet.get('reply_count', 0) > 0
+                    ]
+                    semaphore = asyncio.Semaphore(self.comment_concurrency)
                     
-                    # 如果需要抓取评论
-                    if not skip_comments:
-                        conversation_id = tweet.get("conversation_id_str")
-                        tweet_id = tweet.get("id_str")
-                        
-                        if conversation_id and tweet_id and tweet.get('reply_count', 0) > 0:
+                    async def fetch_comments(tweet_id, conversation_id):
+                        async with semaphore:
                             comments = await self.get_tweet_comments(tweet_id, conversation_id, session)
-                            if comments:
-                                for comment in comments:
-                                    self.save_comment(tweet_id, comment)
-                                self.logger.debug(f"保存推文 {tweet_id} 的 {len(comments)} 条评论")
+                            # 每个并发槽位内，两条推文的评论请求之间间隔 0.2 秒（默认并发数 1 时与逐条获取相同）
+                            await asyncio.sleep(0.2)
+                            return comments
+                    
+                    results = await asyncio.gather(*(fetch_comments(tid, cid) for tid, cid in targets))
                     
-                    await asyncio.sleep(0.2)
+                    for (tweet_id, _), comments in zip(targets, results):
+                        if comments:
+                            for comment in comments:
+                                self.save_comment(tweet_id, comment)
+                            self.logger.debug(f"保存推文 {tweet_id} 的 {len(comments)} 条评论")
                 
                 # 提交事务
                 if self.conn:
@@ -49,7 +49,6 @@ async def call_gpt(prompt: str, json_schema: Optional[Dict[str, Any]] = None) ->
 
 
 if __name__ == "__main__":
-    import asyncio
     response = asyncio.run(call_gpt("Hello, how are you?"))
     print(response)
     test_json = {
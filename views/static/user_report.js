@@ -0,0 +1,265 @@
+// Render the page from the page data (embedded in generated pages, fetched by fetchPageData in the views/ template)
+function loadData() {
+    try {
+        // Display user information
+        document.getElementById('username').textContent = account.username || 'Unknown';
+        document.getElementById('user_id').textContent = account.user_id || '-';
+        document.getElementById('followers_count').textContent = account.followers_count?.toLocaleString() || '-';
+        document.getElementById('friends_count').textContent = account.friends_count?.toLocaleString() || '-';
+        document.getElementById('tweets_count').textContent = account.tweets_count?.toLocaleString() || '-';
+        document.getElementById('description').textContent = account.description || '-';
+
+        // Display total score
+        const totalScore = scores.root?.[userIndex] ?? 0;
+        document.getElementById('totalScore').textContent = formatScore(totalScore);
+
+        // Display root node comment
+        const rootComment = comments.root?.[userIndex] || '';
+        document.getElementById('rootComment').textContent = rootComment || 'No comment available';
+
+        // Render tree structure (excluding root node, as it's already displayed above)
+        renderTree();
+
+        document.getElementById('loading').style.display = 'none';
+        document.getElementById('content').style.display = 'block';
+
+        // Draw radar chart in the next frame, after the now-visible content has been laid out
+        scheduleRadarChart();
+    } catch (error) {
+        showError(error);
+    }
+}
+
+// Show a load or render error in place of the report
+function showError(error) {
+    document.getElementById('loading').style.display = 'none';
+    document.getElementById('error').style.display = 'block';
+    document.getElementById('error').textContent = `Error: ${error.message}`;
+}
+
+// Toggle markup is identical for every node, so build it once
+const TREE_TOGGLE_HTML = '<div class="tree-toggle expanded"></div>';
+const TREE_TOGGLE_SPACER_HTML = '<div class="tree-toggle-spacer"></div>';
+
+// Leaf node names and scores for the radar chart, collected while the score tree is rendered
+let radarLabels = [];
+let radarData = [];
+
+// Render tree node into the shared parts array (the node and all its descendants are pushed in order,
+// so the whole tree is joined once instead of building and joining a string per subtree)
+function renderTreeNode(node, depth, parts) {
+    const key = node.key;
+    const score = scores[key]?.[userIndex] ?? 0;
+    const comment = comments[key]?.[userIndex] ?? "";
+    const children = node.children?.length > 0 ? node.children : null;
+    if (node.is_leaf) {
+        radarLabels.push(node.name);
+        radarData.push(score);
+    }
+
+    parts.push(`<div class="tree-node${node.is_leaf ? ' leaf-node' : ''}" style="margin-left: ${depth * 20}px;">
+        <div class="tree-node-content">
+            `, children ? TREE_TOGGLE_HTML : TREE_TOGGLE_SPACER_HTML, `
+            <div class="tree-node-header">
+                <div class="tree-node-info">
+                    <div>
+                        <span class="tree-node-name">${escapeHtml(node.name)}</span>
+                        <span class="tree-node-weight">(Weight: ${node.weight})</span>
+                    </div>
+                    `);
+    if (node.description) {
+        parts.push('<div class="tree-node-description">', escapeHtml(node.description), '</div>');
+    }
+    if (comment) {
+        parts.push('<div class="tree-node-comment">', escapeHtml(comment), '</div>');
+    }
+    parts.push(`
+                </div>
+            </div>
+            <div class="tree-node-score">
+                <div class="score-bar">
+                    <div class="score-bar-fill" style="width: ${score * 100}%"></div>
+                </div>
+                <div class="score-value">${formatScore(score)}</div>
+            </div>
+        </div>
+        `);
+
+    // Child nodes are rendered into the same parts array, inside this node's children container
+    if (children) {
+        parts.push(`<div class="tree-children" id="children-${key}">`);
+        for (const child of children) {
+            renderTreeNode(child, depth + 1, parts);
+        }
+        parts.push('</div>');
+    }
+    parts.push(`
+    </div>`);
+}
+
+// Render entire tree (excluding root node, only render root's children)
+function renderTree() {
+    const container = document.getElementById('treeContainer');
+    radarLabels = [];
+    radarData = [];
+    if (treeStructure && treeStructure.children && treeStructure.children.length > 0) {
+        // Only render root's children
+        const parts = [];
+        for (const child of treeStructure.children) {
+            renderTreeNode(child, 0, parts);
+        }
+        container.innerHTML = parts.join('');
+    } else {
+        container.innerHTML = '';
+    }
+}
+
+// Toggle node expand/collapse
+function toggleNode(button) {
+    const nodeContent = button.closest('.tree-node-content');
+    const childrenDiv = nodeContent.nextElementSibling;
+
+    if (childrenDiv && childrenDiv.classList.contains('tree-children')) {
+        const isCollapsed = childrenDiv.classList.contains('collapsed');
+        if (isCollapsed) {
+            childrenDiv.classList.remove('collapsed');
+            button.classList.remove('collapsed');
+            button.classList.add('expanded');
+        } else {
+            childrenDiv.classList.add('collapsed');
+            button.classList.remove('expanded');
+            button.classList.add('collapsed');
+        }
+    }
+}
+
+// Delegate toggle clicks to the tree container (one listener instead of an inline handler per node)
+document.getElementById('treeContainer').addEventListener('click', (e) => {
+    const button = e.target.closest('.tree-toggle');
+    if (button) {
+        toggleNode(button);
+    }
+});
+
+// Draw radar chart
+let radarChart = null;
+let radarChartFrame = null;
+// Defer chart drawing to the next animation frame; a pending draw is cancelled if rescheduled
+function scheduleRadarChart() {
+    if (radarChartFrame !== null) {
+        cancelAnimationFrame(radarChartFrame);
+    }
+    radarChartFrame = requestAnimationFrame(() => {
+        radarChartFrame = null;
+        renderRadarChart();
+    });
+}
+
+function renderRadarChart() {
+    if (!scores || userIndex === null) {
+        return;
+    }
+
+    const ctx = document.getElementById('radarChart');
+    if (!ctx) return;
+
+    // If chart already exists, destroy it first
+    if (radarChart) {
+        radarChart.destroy();
+    }
+
+    // Leaf node scores for this user (collected by renderTree in the same traversal)
+    const labels = radarLabels;
+    const data = radarData;
+
+    radarChart = new Chart(ctx, {
+        type: 'radar',
+        data: {
+            labels: labels,
+            datasets: [{
+                label: 'KOL Metrics',
+                data: data,
+                backgroundColor: 'rgba(102, 126, 234, 0.2)',
+                borderColor: 'rgba(102, 126, 234, 1)',
+                borderWidth: 2,
+                pointBackgroundColor: 'rgba(102, 126, 234, 1)',
+                pointBorderColor: '#fff',
+                pointHoverBackgroundColor: '#fff',
+                pointHoverBorderColor: 'rgba(102, 126, 234, 1)'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: true,
+            scales: {
+                r: {
+                    beginAtZero: true,
+                    min: 0,
+                    max: 1,
+                    ticks: {
+                        stepSize: 0.2,
+                        display: true
+                    },
+                    grid: {
+                        color: 'rgba(0, 0, 0, 0.1)'
+                    },
+                    pointLabels: {
+                        font: {
+                            size: 12,
+                            weight: 'bold'
+                        },
+                        color: '#333'
+                    }
+                }
+            },
+            plugins: {
+                legend: {
+                    display: true,
+                    position: 'bottom',
+                    labels: {
+                        font: {
+                            size: 12
+                        },
+                        padding: 15
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            return context.dataset.label + ': ' + (context.parsed.r * 100).toFixed(2) + '%';
+                        }
+                    }
+                }
+            }
+        }
+    });
+}
+
+// Format score
+function formatScore(score) {
+    if (score === null || score === undefined) return '0.00%';
+    return (score * 100).toFixed(2) + '%';
+}
+
+// Escape HTML
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+// Initialize - the views/ template fetches the page data first (fetchPageData), generated pages embed it
+function init() {
+    if (typeof fetchPageData === 'function') {
+        fetchPageData().then(loadData, showError);
+    } else {
+        loadData();
+    }
+}
+
+// Wait for DOM to load
+if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", init);
+} else {
+    init();
+}
@@ -0,0 +1,274 @@
+let filteredData = [];
+let sortColumn = 'root';
+let sortDirection = 'desc';
+let sortedViews = new Map(); // 排序状态（列:方向） -> 按该顺序排好的 filteredData 副本
+let sortIndicatorTh = null; // 当前显示排序指示器的表头单元格
+
+// Elements touched on every render, looked up once (the script runs after the page body)
+const tableBodyEl = document.getElementById('tableBody');
+const searchInputEl = document.getElementById('searchInput');
+const totalUsersEl = document.getElementById('totalUsers');
+const displayedUsersEl = document.getElementById('displayedUsers');
+
+// Dynamically generate table header
+function generateTableHeader() {
+    const thead = document.getElementById('tableHead');
+    const tr = thead.querySelector('tr');
+
+    // Keep the first columns, remove the rest
+    while (tr.children.length > 3) {
+        tr.removeChild(tr.lastChild);
+    }
+
+    // Build the new header cells off-DOM and append them to the row at once
+    const fragment = document.createDocumentFragment();
+    // Add leaf node columns
+    leafNodes.forEach(leaf => {
+        const th = document.createElement('th');
+        th.className = 'sortable';
+        th.setAttribute('data-sort', leaf.key);
+        th.textContent = leaf.name;
+        fragment.appendChild(th);
+    });
+
+    // Add description column
+    const descTh = document.createElement('th');
+    descTh.textContent = 'Description';
+    fragment.appendChild(descTh);
+    tr.appendChild(fragment);
+}
+
+// Dynamically generate sort options
+function generateSortOptions() {
+    const sortSelect = document.getElementById('sortSelect');
+
+    // Keep the first options, remove the rest
+    while (sortSelect.children.length > 2) {
+        sortSelect.removeChild(sortSelect.lastChild);
+    }
+
+    // Build the new options off-DOM and append them to the select at once
+    const fragment = document.createDocumentFragment();
+    // Add leaf node options
+    leafNodes.forEach(leaf => {
+        const option = document.createElement('option');
+        option.value = leaf.key;
+        option.textContent = `Sort by ${leaf.name}`;
+        fragment.appendChild(option);
+    });
+    sortSelect.appendChild(fragment);
+}
+
+// Render the page from the page data (embedded in generated pages, fetched by fetchPageData in the views/ template)
+function loadData() {
+    try {
+        // Dynamically generate table header and sort options
+        generateTableHeader();
+        generateSortOptions();
+
+        // Merge data (dynamically add leaf node scores)
+        sortedViews = new Map();
+        filteredData = accounts.map((account, index) => {
+            const item = {
+                ...account,
+                index: index,
+                root: scores.root?.[index] ?? 0,
+                // Search fields (lowercased once here instead of on every keystroke)
+                searchKeys: [
+                    account.username?.toLowerCase(),
+                    account.user_id?.toString(),
+                    account.description?.toLowerCase()
+                ].filter(key => key !== undefined)
+            };
+
+            // Dynamically add leaf node scores
+            leafNodes.forEach(leaf => {
+                item[leaf.key] = scores[leaf.key]?.[index] ?? 0;
+            });
+
+            return item;
+        });
+        // The default order (total score, descending) is computed at build time, so the first render does not sort
+        // (the views/ template has no precomputed order and sorts on the first render instead)
+        if (rootOrder) {
+            sortedViews.set('root:desc', rootOrder.map(index => filteredData[index]));
+        }
+
+        document.getElementById('loading').style.display = 'none';
+        document.getElementById('scoreTable').style.display = 'table';
+        renderTable();
+    } catch (error) {
+        showError(error);
+    }
+}
+
+// Show a load or render error in place of the table
+function showError(error) {
+    document.getElementById('loading').style.display = 'none';
+    document.getElementById('error').style.display = 'block';
+    document.getElementById('error').textContent = `Error: ${error.message}`;
+}
+
+// Build the table row for one account (row content does not depend on sort order or search,
+// so each row is built once and reused by later renders)
+function buildRow(item) {
+    const row = document.createElement('tr');
+    const rowParts = [`
+        <td>
+            <div class="username" data-index="${item.index}">${escapeHtml(item.username || 'Unknown')}</div>
+        </td>
+        <td>
+            <div class="user-id">${escapeHtml(item.user_id || '')}</div>
+        </td>
+        <td class="score-cell">
+            <div class="score-bar">
+                <div class="score-bar-fill" style="width: ${item.root * 100}%"></div>
+            </div>
+            ${formatScore(item.root)}
+        </td>
+    `];
+
+    // Dynamically generate leaf node columns
+    leafNodes.forEach(leaf => {
+        const score = item[leaf.key] ?? 0;
+        rowParts.push(`
+            <td class="score-cell">
+                <div class="score-bar">
+                    <div class="score-bar-fill" style="width: ${score * 100}%"></div>
+                </div>
+                ${formatScore(score)}
+            </td>
+        `);
+    });
+
+    // Description column
+    rowParts.push(`
+        <td class="description-cell">
+            ${escapeHtml(item.description || '')}
+        </td>
+    `);
+
+    row.innerHTML = rowParts.join('');
+    return row;
+}
+
+// Render table
+function renderTable() {
+    // Sort
+    // Each sort order is computed once from the original order and cached, so switching back to
+    // an earlier column or direction reuses its result instead of sorting again
+    const sortKey = `${sortColumn}:${sortDirection}`;
+    let sortedData = sortedViews.get(sortKey);
+    if (!sortedData) {
+        // Read each item's sort value once (not twice per comparison) and sort the [value, item] pairs
+        const direction = sortDirection === 'asc' ? 1 : -1;
+        sortedData = filteredData
+            .map(item => [item[sortColumn] ?? 0, item])
+            .sort(([aVal], [bVal]) => aVal > bVal ? direction : aVal < bVal ? -direction : 0)
+            .map(([, item]) => item);
+        sortedViews.set(sortKey, sortedData);
+    }
+
+    // Search filter (match against the precomputed search fields)
+    const searchTerm = searchInputEl.value.toLowerCase();
+    const displayData = searchTerm
+        ? sortedData.filter(item => item.searchKeys.some(key => key.includes(searchTerm)))
+        : sortedData;
+
+    // Update statistics
+    totalUsersEl.textContent = filteredData.length;
+    displayedUsersEl.textContent = displayData.length;
+
+    // Build rows off-DOM in a fragment, then swap them into tbody in one mutation
+    const fragment = document.createDocumentFragment();
+    displayData.forEach(item => {
+        // Reuse the row built on an earlier render
+        fragment.appendChild(item.row ??= buildRow(item));
+    });
+    tableBodyEl.replaceChildren(fragment);
+
+    // Update table header sort indicator (only the previous and the current sorted header are touched)
+    if (sortIndicatorTh) {
+        sortIndicatorTh.classList.remove('sort-asc', 'sort-desc');
+    }
+    sortIndicatorTh = document.querySelector(`th.sortable[data-sort="${sortColumn}"]`);
+    if (sortIndicatorTh) {
+        sortIndicatorTh.classList.add(sortDirection === 'asc' ? 'sort-asc' : 'sort-desc');
+    }
+}
+
+// Format score
+function formatScore(score) {
+    if (score === null || score === undefined) return '0.00%';
+    return (score * 100).toFixed(2) + '%';
+}
+
+// Escape HTML
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+// Event listeners
+// Coalesce search keystrokes: re-render at most once per animation frame
+let renderPending = false;
+searchInputEl.addEventListener('input', () => {
+    if (renderPending) return;
+    renderPending = true;
+    requestAnimationFrame(() => {
+        renderPending = false;
+        renderTable();
+    });
+});
+
+document.getElementById('sortSelect').addEventListener('change', (e) => {
+    sortColumn = e.target.value;
+    renderTable();
+});
+
+// Username links: one delegated listener on the table body instead of an inline onclick per row
+tableBodyEl.addEventListener('click', (e) => {
+    const username = e.target.closest('.username');
+    if (username) {
+        window.location.href = userPageHref(username.dataset.index);
+    }
+});
+
+// Table header sorting
+document.addEventListener('DOMContentLoaded', () => {
+    // Use event delegation to handle dynamically generated table headers
+    document.getElementById('tableHead').addEventListener('click', (e) => {
+        const th = e.target.closest('th.sortable');
+        if (!th) return;
+
+        const column = th.getAttribute('data-sort');
+        if (sortColumn === column) {
+            sortDirection = sortDirection === 'asc' ? 'desc' : 'asc';
+        } else {
+            sortColumn = column;
+            sortDirection = 'desc';
+        }
+
+        // Update sort select box
+        document.getElementById('sortSelect').value = sortColumn;
+
+        renderTable();
+    });
+});
+
+// Initialize - the views/ template fetches the page data first (fetchPageData), generated pages embed it
+function init() {
+    if (typeof fetchPageData === 'function') {
+        fetchPageData().then(loadData, showError);
+    } else {
+        loadData();
+    }
+}
+
+// Wait for DOM to load
+if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", init);
+} else {
+    init();
+}